@@ -7,7 +7,7 @@ Created on 04.09.2018
 
 """
 
-import io
+import threading
 import time
 
 import loader
@@ -16,36 +16,72 @@ import pygame
 
 
 class Sound:
-    """Sound class for solitaires."""
+    """Sound class for solitaires, sounds are decoded in background thread."""
+
+    PRELOAD = ('deal', 'distrib', 'open')
 
     def __init__(self, volume):
-        """Initialize sound class."""
-        self.__sounds = loader.sounds(volume)
+        """Initialize sound class and start decoding sounds, sounds of deal first."""
+        self.volume = volume
+        self.__map, self.__index = loader.sounds()
+        self.__sounds = {}
+        self.__lock = threading.Lock()
+        self.decode_span = None
+        names = [name for name in self.PRELOAD if name in self.__index]
+        names.extend(name for name in self.__index if name not in names)
+        threading.Thread(target=self.__preload, args=(names,), daemon=True).start()
+
+    def __preload(self, names):
+        """Decode sounds in order of names."""
+        start = time.perf_counter()
+        for name in names:
+            self.__load(name)
+        self.decode_span = (start, time.perf_counter())
+
+    def __load(self, name):
+        """Decode sound by name if it is not ready, return sound."""
+        with self.__lock:
+            if name not in self.__sounds:
+                wav = pygame.mixer.Sound(file=loader.PackItem(self.__map, *self.__index[name]))
+                wav.set_volume(self.volume)
+                self.__sounds[name] = wav
+            return self.__sounds[name]
 
     def get_sound_names(self):
         """Return names all sounds effects."""
-        return list(self.__sounds.keys())
+        return list(self.__index.keys())
 
     def play(self, name):
-        """Play sound by name."""
-        self.__sounds[name].play()
+        """Play sound by name, decode it now if it is not ready."""
+        wav = self.__sounds.get(name)
+        if wav is None:
+            wav = self.__load(name)
+        wav.play()
 
 
 class Music:
     """Music class for solitaires."""
 
     def __init__(self, volume):
-        """Initialize music class."""
-        self.__music = loader.music()
+        """Initialize music class, music file is opened on first use."""
+        self.__map = None
+        self.__music = {}
         pygame.mixer.music.set_volume(volume)
 
+    def __open(self):
+        """Open music file with index of tracks."""
+        if self.__map is None:
+            self.__map, self.__music = loader.music()
+
     def get_music_names(self):
         """Return names all musics in collect."""
+        self.__open()
         return list(self.__music.keys())
 
     def play(self, name):
-        """Play music by name."""
-        pygame.mixer.music.load(io.BytesIO(self.__music[name]))
+        """Play music by name, track is read from memory map."""
+        self.__open()
+        pygame.mixer.music.load(loader.PackItem(self.__map, *self.__music[name]))
         pygame.mixer.music.play()
 
 
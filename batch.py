@@ -0,0 +1,77 @@
+"""
+Batch solver for check deals by seeds on all cores.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python batch.py 0 100000 results.txt
+
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+from configparser import ConfigParser
+
+import engine
+
+from solver import Solver
+
+
+__solver = None
+__delivery = 1
+__deck_count = 52
+
+
+def __init_solver(delivery, deck_count, nodes, seconds, table_size):
+    """Create solver once in process."""
+    global __solver, __delivery, __deck_count
+    __solver = Solver(nodes, seconds, table_size)
+    __delivery = delivery
+    __deck_count = deck_count
+
+
+def __solve_seed(seed):
+    """Solve deal with seed, return seed, winnable, nodes and time."""
+    game = engine.Engine(__delivery, __deck_count)
+    game.setup(engine.shuffled_deck(__deck_count, seed))
+    start = time.perf_counter()
+    winnable = __solver.solve(game)
+    return (seed, winnable, __solver.nodes, time.perf_counter() - start)
+
+
+def solve_seeds(seeds, delivery, deck_count, nodes, seconds, table_size, file_name, processes=None):
+    """Solve deals by seeds in pool of processes and write results in file as they finish."""
+    chunksize = max(1, min(16, len(seeds) // (4 * (processes or os.cpu_count() or 1))))
+    with multiprocessing.Pool(processes, __init_solver, (delivery, deck_count, nodes, seconds, table_size)) as pool:
+        with open(file_name, 'a') as results_file:
+            for seed, winnable, nodes_count, seconds_count in pool.imap_unordered(__solve_seed, seeds, chunksize):
+                verdict = -1 if winnable is None else int(winnable)
+                results_file.write('{}\t{}\t{}\t{:.4f}\n'.format(seed, verdict, nodes_count, seconds_count))
+                results_file.flush()
+
+
+def read_results(file_name):
+    """Read results file, return list of (seed, winnable, nodes, time), winnable is None if budget was over."""
+    results = []
+    with open(file_name, 'r') as results_file:
+        for line in results_file:
+            seed, verdict, nodes_count, seconds_count = line.split()
+            results.append((int(seed), None if '-1' == verdict else bool(int(verdict)), int(nodes_count), float(seconds_count)))
+    return results
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    config = ConfigParser()
+    config.read('settings.ini')
+    delivery = 3 if '3' == config.get('board', 'delivery') else 1
+    deck_count = 36 if 'half' == config.get('board', 'deck') else 52
+    file_name = sys.argv[3] if len(sys.argv) > 3 else 'results_{}_{}.txt'.format(deck_count, delivery)
+    solve_seeds(range(int(sys.argv[1]), int(sys.argv[2])), delivery, deck_count,
+                config.getint('solver', 'nodes'), config.getfloat('solver', 'seconds'),
+                config.getint('solver', 'table_size'), file_name)
@@ -0,0 +1,216 @@
+"""
+Benchmarks for hot paths of solitaire.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python benchmark.py benchmark.json baseline.json
+
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from configparser import ConfigParser
+
+import pygame
+
+from audio import Sound
+
+from board import Board
+
+import checker
+
+from constants import Cards
+
+import engine
+
+import loader
+
+import processes
+
+from solver import Solver
+
+
+BENCHMARK_VERSION = 1
+TOLERANCE = 0.25
+
+
+def measure(function, repeat):
+    """Run function repeat times, return min and mean time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'mean': sum(times) / len(times), 'runs': repeat}
+
+
+def stack(count=13):
+    """Return open column from king down with alternating colors."""
+    return [(3 if index % 2 else 0) << 4 | (13 - index) | Cards.FACE_UP for index in range(count)]
+
+
+class Benchmark:
+    """Benchmark class with board on dummy display and sound drivers."""
+
+    def __init__(self, repeat=5):
+        """Initialize benchmark class with full deck and without deal delays."""
+        self.repeat = repeat
+        self.config = ConfigParser()
+        self.config.read('settings.ini')
+        self.config.set('board', 'deck', 'full')
+        self.config.set('board', 'winnable', 'false')
+        self.config.set('board', 'deal_delay', '0')
+        pygame.init()
+        pygame.mixer.init()
+        self.screen = pygame.display.set_mode((self.config.getint('screen', 'size_x'), self.config.getint('screen', 'size_y')))
+        self.sounds = Sound(0)
+        self.cache_dir = tempfile.mkdtemp()
+        loader.CACHE_DIR = self.cache_dir
+        self.results = {}
+
+    def run(self):
+        """Run all benchmarks, failed benchmark keeps error message, pool and cache are removed even on interrupt."""
+        try:
+            for name in ('board_init_cold', 'board_init_warm', 'svg2png', 'png2tex', 'deal', 'draw_full', 'draw_idle', 'rules', 'moves', 'solver'):
+                try:
+                    self.results[name] = getattr(self, name)()
+                except Exception as error:
+                    self.results[name] = {'error': repr(error)}
+        finally:
+            processes.close_pool()
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        return self.results
+
+    def board_init_cold(self):
+        """Board creation with empty textures cache until textures of deal are ready."""
+        def init():
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            board = Board(self.config, self.screen, self.sounds)
+            board.create_deck(0)
+            board.textures.wait()
+        return measure(init, self.repeat)
+
+    def board_init_warm(self):
+        """Board creation with all textures in cache."""
+        board = Board(self.config, self.screen, self.sounds)
+        board.textures.load_svg()
+        board.textures.preload(['back'] + list(board.textures.svg_cards))
+        board.textures.wait()
+        self.board = board
+        return measure(lambda: Board(self.config, self.screen, self.sounds), self.repeat)
+
+    def svg2png(self):
+        """Convert svg of all cards to png in pool of processes."""
+        textures = self.board.textures
+        svg_cards = dict(textures.svg_cards)
+        self.png = None
+
+        def convert():
+            self.png = processes.svg2png(svg_cards, textures.svg_start_pos, textures.svg_card_size, textures.defs_string)
+        return measure(convert, self.repeat)
+
+    def png2tex(self):
+        """Convert png of all cards in textures."""
+        return measure(lambda: processes.png2tex(self.png, self.board.card_x, self.board.card_y), self.repeat)
+
+    def deal(self):
+        """Create deck and distribution cards in zones."""
+        def deal():
+            self.board.create_deck(0)
+            self.board.clear_zones()
+            self.board.distribution()
+        return measure(deal, self.repeat * 20)
+
+    def draw_full(self):
+        """Draw frame of board with all zones repainted."""
+        def draw():
+            self.board.repaint()
+            self.board.draw()
+        return measure(draw, self.repeat * 20)
+
+    def draw_idle(self):
+        """Draw frame of board without changes."""
+        def draw():
+            self.board.update()
+            self.board.draw()
+        return measure(draw, self.repeat * 20)
+
+    def rules(self):
+        """Check rules on synthetic stacks in columns."""
+        cards = stack()
+        game = engine.Engine(1, 52)
+        game.columns[0].extend(cards)
+        game.columns[1].append(cards[0])
+
+        def rules():
+            for _ in range(1000):
+                checker.change_suits(cards)
+                checker.rate_down(cards)
+                game.can_take(engine.COLUMNS, 0, 1)
+                game.can_put(cards[1:], engine.COLUMNS, 1)
+                game.put(engine.COLUMNS, 0, 1, engine.COLUMNS, 1)
+                game.put(engine.COLUMNS, 1, 1, engine.COLUMNS, 0)
+        return measure(rules, self.repeat)
+
+    def moves(self):
+        """Generate legal moves in dealt game."""
+        game = engine.Engine(1, 52)
+        game.setup(engine.shuffled_deck(52, 0))
+
+        def moves():
+            for _ in range(1000):
+                game.moves()
+        return measure(moves, self.repeat)
+
+    def solver(self):
+        """Solve deals of half deck by fixed seeds."""
+        def solve():
+            for seed in range(5):
+                game = engine.Engine(1, 36)
+                game.setup(engine.shuffled_deck(36, seed))
+                Solver(nodes=20000).solve(game)
+        return measure(solve, self.repeat)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return list of (name, current, baseline, ratio) and names of regressions."""
+    rows = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        if 'min' not in result or 'min' not in base:
+            continue
+        ratio = result['min'] / base['min'] if base['min'] else 1.0
+        rows.append((name, result['min'], base['min'], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+if __name__ == '__main__':
+    output_name = sys.argv[1] if len(sys.argv) > 1 else 'benchmark.json'
+    results = Benchmark().run()
+    with open(output_name, 'w') as output_file:
+        json.dump({'version': BENCHMARK_VERSION, 'python': platform.python_version(), 'pygame': pygame.version.ver,
+                   'platform': platform.platform(), 'results': results}, output_file, indent=4)
+    for name, result in results.items():
+        print('{:16} {}'.format(name, '{:.6f} s'.format(result['min']) if 'min' in result else result['error']))
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'r') as baseline_file:
+            rows, regressions = compare(results, json.load(baseline_file)['results'])
+        for name, current, base, ratio in rows:
+            print('{:16} {:.6f} s baseline {:.6f} s x{:.2f}{}'.format(name, current, base, ratio, ' REGRESSION' if name in regressions else ''))
+        pygame.quit()
+        sys.exit(1 if regressions else 0)
+    pygame.quit()
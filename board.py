@@ -7,15 +7,18 @@ Created on 01.09.2018
 
 """
 
+import collections
 import random
 import time
-import xml.etree.ElementTree as etree
 
 from card import Card
 
 from constants import Cards
 
-import loader
+from deals import DealsIndex
+from deals import index_name
+
+import engine
 
 from zones import get_zones
 
@@ -23,56 +26,67 @@ from zones import get_zones
 class Board:
     """Board class for solitaire."""
 
-    def __init__(self, config, screen, sounds):
-        """Initialize board class."""
+    def __init__(self, config, screen, sounds, headless=False):
+        """Initialize board class, headless board has no textures and delays."""
         self.config = config
         self.screen = screen
         self.sounds = sounds
+        self.headless = headless
+        self.random = random.Random()
+        self.deal_delay = 0 if self.headless else self.config.getfloat('board', 'deal_delay')
+        self.animation = collections.deque()
 
-        CARD_ROW = 5
-        CARD_COL = 13
         self.card_x = self.config.getint('board', 'card_x')
         self.card_y = self.config.getint('board', 'card_y')
 
         self.deck = []
-        etree.register_namespace("", "http://www.w3.org/2000/svg")
-        etree.register_namespace("xlink", "http://www.w3.org/1999/xlink")
-        self.svg = etree.parse('cards.svg')
-        root = self.svg.getroot()
-        viewBox = [float(param) for param in root.attrib['viewBox'].split(' ')]
-        START_POS = (viewBox[0], viewBox[1])
-        CARD_SIZE = (viewBox[2] / CARD_COL, viewBox[3] / CARD_ROW)
-        prefix = "{http://www.w3.org/2000/svg}"
-        cards_iter = root.iterfind('./' + prefix + 'g/')
-        defs_iter = root.iterfind('./' + prefix + 'defs/')
-        self.defs = {obj.attrib['id']: obj for obj in defs_iter}
-        self.svg_cards = {card.attrib['id']: card for card in cards_iter}
-        joker_addons = [elem for elem in self.svg_cards['joker_black'].findall('./') if prefix + 'g' == elem.tag]
-        for addon in joker_addons:
-            self.svg_cards['joker_red'].append(addon)
-        self.textures = loader.textures(self.svg_cards, START_POS, CARD_SIZE, self.defs, self.card_x, self.card_y)
+        self.deck_count = None
+        self.seed = None
+        self.cards = {}
+        self.deals = {}
+        self.textures = None
+        if not self.headless:
+            self.create_textures()
 
         self.create_zones()
 
-    def create_deck(self):
-        """Create all cards."""
-        self.deck.clear()
-        self.delivery = 3 if '3' == self.config.get('board', 'delivery') else 1
-        self.deck_count = 36 if 'half' == self.config.get('board', 'deck') else 52
-
-        for suit in Cards.suits:
-            for rate in range(1, 14):
-                if 36 == self.deck_count:
-                    if 1 < rate < 6:
-                        continue
-                self.deck.append(Card(rate, suit, self.card_x, self.card_y, self.deck_count))
+    def create_textures(self):
+        """Create lazy textures, svg file with cards is parsed in background."""
+        from textures import Textures
+        cache_size = self.config.getint('board', 'texture_cache') * 1024 * 1024
+        self.textures = Textures('cards.svg', self.card_x, self.card_y, cache_size)
 
-        for card in self.deck:
-            card.tex_face = self.textures[card.tex_name]
-            card.tex_back = self.textures['back']
-
-        random.seed()
-        random.shuffle(self.deck)
+    def create_deck(self, seed=None):
+        """Create deck of card codes and card views for new game, deal is defined by seed."""
+        self.delivery = 3 if '3' == self.config.get('board', 'delivery') else 1
+        deck_count = 36 if 'half' == self.config.get('board', 'deck') else 52
+        if deck_count != self.deck_count:
+            self.deck_count = deck_count
+            self.cards = {}
+            for code in engine.new_deck(self.deck_count):
+                card = Card(code, self.card_x, self.card_y, self.deck_count)
+                card.textures = self.textures
+                self.cards[code] = card
+        for card in self.cards.values():
+            card.status = False
+            if card.take:
+                card.take = False
+
+        self.seed = seed
+        if self.seed is None and self.config.getboolean('board', 'winnable'):
+            self.seed = self.deals_index().seed(self.random)
+        if self.seed is None:
+            self.seed = self.random.getrandbits(64)
+        self.deck = engine.shuffled_deck(self.deck_count, self.seed)
+        if self.textures is not None:
+            self.textures.preload(['back'] + [self.cards[code].tex_name for code in self.deck])
+
+    def deals_index(self):
+        """Return index of winnable deals for deck and delivery in settings, index is empty without file."""
+        key = (36 if 'half' == self.config.get('board', 'deck') else 52, 3 if '3' == self.config.get('board', 'delivery') else 1)
+        if key not in self.deals:
+            self.deals[key] = DealsIndex(index_name(*key), *key)
+        return self.deals[key]
 
     def create_zones(self):
         """Create all gaming zones."""
@@ -103,27 +117,53 @@ class Board:
         for zone in self.zones:
             zone.clear()
 
+    def update(self):
+        """Mark all zones for check changes."""
+        for zone in self.zones:
+            zone.update()
+
+    def repaint(self):
+        """Mark all zones for redraw."""
+        for zone in self.zones:
+            zone.repaint()
+
     def draw(self):
-        """Draw method for board."""
+        """Draw changed zones on board and return dirty rects."""
+        rects = []
         for zone in self.zones:
-            zone.draw(self.screen)
+            rects.extend(zone.draw(self.screen))
+        return rects
 
     def distribution(self):
-        """Distribution cards in new game."""
-        while self.deck:
-            card = self.deck.pop()
-            card.status = False
-            self.zones[1].cards.append(card)
-            self.sounds.play('deal')
-            time.sleep(0.05)
-
-        for start_row in range(len(self.zones[4].rows)):
-            for row in range(start_row, len(self.zones[4].rows)):
-                self.zones[4].rows[row].append(self.zones[1].cards.pop())
-                self.sounds.play('distrib')
-                time.sleep(0.05)
-
-        for row in range(len(self.zones[4].rows)):
-            self.zones[4].rows[row][-1].status = True
-            self.sounds.play('open')
-            time.sleep(0.05)
+        """Distribution cards in new game, sounds of deal are scheduled for animate."""
+        self.engine = engine.Engine(self.delivery, self.deck_count)
+        self.engine.setup(self.deck)
+        self.animation.clear()
+        if self.deal_delay > 0:
+            names = ['deal'] * len(self.deck)
+            names.extend(['distrib'] * sum(len(row) for row in self.engine.columns))
+            names.extend(['open'] * len(self.engine.columns))
+            start = time.perf_counter()
+            self.animation.extend((start + index * self.deal_delay, name) for index, name in enumerate(names))
+        self.deck.clear()
+        self.sync()
+
+    def animate(self):
+        """Play sounds of deal which time has come, return True while deal is playing."""
+        now = time.perf_counter()
+        while self.animation and self.animation[0][0] <= now:
+            self.sounds.play(self.animation.popleft()[1])
+        return bool(self.animation)
+
+    def sync(self):
+        """Put cards in zones as piles in engine."""
+        for index, zone in enumerate(self.zones):
+            rows = zone.rows if zone.if_rows else [zone.cards]
+            for row, pile in zip(rows, self.engine.rows(index)):
+                row[:] = [self.cards[code & ~Cards.FACE_UP] for code in pile]
+                for card, code in zip(row, pile):
+                    status = bool(code & Cards.FACE_UP)
+                    if status != card.status:
+                        card.status = status
+            if -zone.current_card > len(rows[zone.current_row]):
+                zone.current_card = -1
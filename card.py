@@ -7,47 +7,40 @@ Created on 27.08.2018
 
 """
 
+from constants import Cards
 from constants import Colors
 
 import pygame
 
 
 class Card:
-    """Card class for solitaires."""
+    """Card view class for render card code on board."""
+
+    __slots__ = ('code', 'tex_name', 'textures', 'surface', 'color', '__RATE', '__RATE_NAME', '__SUIT', '__WIDTH', '__HEIGHT', '__status', '__take')
 
     rate_index = property(lambda self: self.__RATE)
     rate = property(lambda self: self.__RATE_NAME)
     suit = property(lambda self: self.__SUIT)
 
-    def __init__(self, rate, suit, width, height, deck_count):
+    def __init__(self, code, width, height, deck_count):
         """Initialize card class."""
-        self.__RATE = rate
-        self.__SUIT = suit
+        self.code = code
+        self.__RATE = code & Cards.RATE
+        self.__SUIT = Cards.suits[(code & Cards.SUIT) >> 4]
         self.__WIDTH = width
         self.__HEIGHT = height
         self.color = Colors.YELLOW
         self.__status = False
         self.__take = False
 
-        if 11 == self.__RATE:
-            self.__RATE_NAME = 'jack'
-            self.tex_name = '_'.join(['jack', self.__SUIT])
-        elif 12 == self.__RATE:
-            self.__RATE_NAME = 'queen'
-            self.tex_name = '_'.join(['queen', self.__SUIT])
-        elif 13 == self.__RATE:
-            self.__RATE_NAME = 'king'
-            self.tex_name = '_'.join(['king', self.__SUIT])
+        rate = 1 if 36 == deck_count and 5 == self.__RATE else self.__RATE
+        self.__RATE_NAME = Cards.rates[rate]
+        if 11 <= rate:
+            self.tex_name = '_'.join([self.__RATE_NAME, self.__SUIT])
         else:
-            self.__RATE_NAME = 'ace' if 1 == self.__RATE else str(self.__RATE)
-            self.tex_name = '_'.join([self.__SUIT, str(self.__RATE)])
-
-        if 36 == deck_count:
-            if 1 == self.__RATE:
-                self.__RATE = 5
+            self.tex_name = '_'.join([self.__SUIT, str(rate)])
 
-        self.tex_face = None
-        self.tex_back = None
+        self.textures = None
 
         self.surface = pygame.Surface((self.__WIDTH, self.__HEIGHT))
 
@@ -60,10 +53,12 @@ class Card:
     def status(self, value):
         """Setter for status card."""
         self.__status = value
+        if self.textures is None:
+            return
         if self.status:
-            self.surface.blit(self.tex_face, (0, 0))
+            self.surface.blit(self.textures[self.tex_name], (0, 0))
         else:
-            self.surface.blit(self.tex_back, (0, 0))
+            self.surface.blit(self.textures['back'], (0, 0))
 
     @property
     def take(self):
@@ -74,6 +69,8 @@ class Card:
     def take(self, value):
         """Setter for take status card."""
         self.__take = value
+        if self.textures is None:
+            return
         if self.take:
             pygame.draw.rect(self.surface, self.color, (0, 0, self.__WIDTH, self.__HEIGHT), 1)
         else:
@@ -12,10 +12,7 @@ from constants import Cards
 
 def change_suit(card1, card2):
     """Check change suit two cards."""
-    if card1.suit in Cards.black_suits:
-        return True if card2.suit in Cards.red_suits else False
-    else:
-        return True if card2.suit in Cards.black_suits else False
+    return True if (card1 ^ card2) & Cards.RED else False
 
 
 def change_suits(cards):
@@ -31,6 +28,6 @@ def rate_down(cards):
     """Check down rate index cards."""
     for index, card in enumerate(cards):
         if (len(cards) - 1) > index:
-            if cards[index + 1].rate_index != card.rate_index - 1:
+            if cards[index + 1] & Cards.RATE != (card & Cards.RATE) - 1:
                 return False
     return True
@@ -16,15 +16,23 @@ from Cython.Distutils import build_ext
 
 ext_modules = [
                Extension("audio", ["audio.py"]),
+               Extension("batch", ["batch.py"]),
                Extension("board", ["board.py"]),
                Extension("card", ["card.py"]),
                Extension("checker", ["checker.py"]),
                Extension("constants", ["constants.py"]),
+               Extension("deals", ["deals.py"]),
+               Extension("engine", ["engine.py"]),
                Extension("game", ["game.py"]),
                Extension("loader", ["loader.py"]),
                Extension("player", ["player.py"]),
                Extension("processes", ["processes.py"]),
+               Extension("profiler", ["profiler.py"]),
+               Extension("replay", ["replay.py"]),
+               Extension("resources", ["resources.py"]),
+               Extension("solver", ["solver.py"]),
                Extension("speech", ["speech.py"]),
+               Extension("textures", ["textures.py"]),
                Extension("Tolk", ["Tolk.py"]),
                Extension("zones", ["zones.py"])
               ]
@@ -29,3 +29,9 @@ class Cards:
     black_suits = ['club', 'spade']
     red_suits = ['diamond', 'heart']
     suits = black_suits + red_suits
+    rates = [None, 'ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king']
+
+    RATE = 0x0F
+    SUIT = 0x30
+    RED = 0x20
+    FACE_UP = 0x40
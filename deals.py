@@ -0,0 +1,124 @@
+"""
+Index of winnable deals by seeds.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python deals.py 10000
+
+"""
+
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+
+from configparser import ConfigParser
+
+import batch
+
+
+INDEX_MAGIC = b'SOLDEALS'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<8sHHHH')
+INDEX_SEED = struct.Struct('<Q')
+BUCKETS = (100, 1000, 10000)
+
+
+def index_name(deck_count, delivery):
+    """Return file name index of winnable deals for deck and delivery."""
+    return 'deals_{}_{}.dat'.format(deck_count, delivery)
+
+
+def bucket(nodes):
+    """Return difficulty bucket of deal by solver nodes."""
+    for index, limit in enumerate(BUCKETS):
+        if nodes < limit:
+            return index
+    return len(BUCKETS)
+
+
+def save_index(name, deck_count, delivery, buckets):
+    """Write index: header, offsets of buckets and packed 64-bit seeds."""
+    offsets = [0]
+    for seeds in buckets:
+        offsets.append(offsets[-1] + len(seeds))
+    temp_name = name + '.tmp'
+    with open(temp_name, 'wb') as index_file:
+        index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, deck_count, delivery, len(buckets)))
+        index_file.write(struct.pack('<{}I'.format(len(offsets)), *offsets))
+        for seeds in buckets:
+            index_file.write(struct.pack('<{}Q'.format(len(seeds)), *seeds))
+    os.replace(temp_name, name)
+
+
+class DealsIndex:
+    """Memory mapped index of winnable seeds."""
+
+    def __init__(self, name, deck_count, delivery):
+        """Initialize index class, index is empty if file not found or stale."""
+        self.offsets = [0]
+        self.__map = None
+        self.__start = 0
+        try:
+            with open(name, 'rb') as index_file:
+                self.__map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_deck, index_delivery, count = INDEX_HEADER.unpack_from(self.__map)
+            if INDEX_MAGIC != magic or INDEX_VERSION != version:
+                raise ValueError('unknown index format')
+            if index_deck != deck_count or index_delivery != delivery:
+                raise ValueError('index is for other game')
+            self.offsets = list(struct.unpack_from('<{}I'.format(count + 1), self.__map, INDEX_HEADER.size))
+            self.__start = INDEX_HEADER.size + 4 * (count + 1)
+            if len(self.__map) < self.__start + INDEX_SEED.size * self.offsets[-1]:
+                raise ValueError('index is truncated')
+        except (IOError, ValueError, struct.error):
+            self.close()
+            self.offsets = [0]
+
+    def __len__(self):
+        """Return count seeds in index."""
+        return self.offsets[-1]
+
+    def seed(self, rnd, difficulty=None):
+        """Return random seed from index or difficulty bucket, None if empty."""
+        first, last = (0, len(self)) if difficulty is None else self.offsets[difficulty:difficulty + 2]
+        if first == last:
+            return None
+        return INDEX_SEED.unpack_from(self.__map, self.__start + INDEX_SEED.size * rnd.randrange(first, last))[0]
+
+    def close(self):
+        """Close memory map of index."""
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+
+def build_index(results_name, deck_count, delivery):
+    """Write index of winnable seeds from batch results file."""
+    buckets = [[] for _ in range(len(BUCKETS) + 1)]
+    seeds = set()
+    for seed, winnable, nodes, _ in batch.read_results(results_name):
+        if winnable and seed not in seeds:
+            seeds.add(seed)
+            buckets[bucket(nodes)].append(seed)
+    save_index(index_name(deck_count, delivery), deck_count, delivery, buckets)
+    return len(seeds)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    config = ConfigParser()
+    config.read('settings.ini')
+    deck_count = int(sys.argv[2]) if len(sys.argv) > 2 else 36 if 'half' == config.get('board', 'deck') else 52
+    delivery = int(sys.argv[3]) if len(sys.argv) > 3 else 3 if '3' == config.get('board', 'delivery') else 1
+    results_name = 'deals_{}_{}.txt'.format(deck_count, delivery)
+    rnd = random.SystemRandom()
+    batch.solve_seeds([rnd.getrandbits(64) for _ in range(int(sys.argv[1]))], delivery, deck_count,
+                      config.getint('solver', 'nodes'), config.getfloat('solver', 'seconds'),
+                      config.getint('solver', 'table_size'), results_name)
+    print(build_index(results_name, deck_count, delivery))
@@ -0,0 +1,257 @@
+"""
+Headless engine with rules for solitaire.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+"""
+
+import random
+
+import checker
+
+from constants import Cards
+
+
+RECALL, DECK, INCOMING, HOUSE, COLUMNS = range(5)
+MOVE_PUT, MOVE_DROP, MOVE_DEAL, MOVE_RECALL = range(4)
+
+
+def new_deck(deck_count):
+    """Return codes all cards of deck in order of suits and rates."""
+    cards = []
+    for suit_index in range(len(Cards.suits)):
+        for rate in range(1, 14):
+            if 36 == deck_count:
+                if 1 < rate < 6:
+                    continue
+                if 1 == rate:
+                    rate = 5
+            cards.append(suit_index << 4 | rate)
+    return cards
+
+
+def shuffled_deck(deck_count, seed):
+    """Return codes of deck shuffled by own random generator with seed."""
+    cards = new_deck(deck_count)
+    random.Random(seed).shuffle(cards)
+    return cards
+
+
+def rate(card):
+    """Return rate index card code."""
+    return card & Cards.RATE
+
+
+def suit(card):
+    """Return suit index card code."""
+    return (card & Cards.SUIT) >> 4
+
+
+class Engine:
+    """Engine class for solitaire, cards in piles are codes with face up flag."""
+
+    def __init__(self, delivery=1, deck_count=52):
+        """Initialize engine class."""
+        self.delivery = delivery
+        self.deck_count = deck_count
+        self.ace = 5 if 36 == deck_count else 1
+        self.clear()
+
+    def clear(self):
+        """Clear all piles."""
+        self.recall = []
+        self.deck = []
+        self.incoming = []
+        self.house = [[] for _ in range(4)]
+        self.columns = [[] for _ in range(7)]
+        self.zones = [[self.recall], [self.deck], [self.incoming], self.house, self.columns]
+
+    def setup(self, cards):
+        """Distribution cards in new game from shuffled deck, last card on top."""
+        self.clear()
+        self.deck.extend(card & ~Cards.FACE_UP for card in reversed(cards))
+        for start_row in range(len(self.columns)):
+            for row in range(start_row, len(self.columns)):
+                self.columns[row].append(self.deck.pop())
+        for row in self.columns:
+            row[-1] |= Cards.FACE_UP
+
+    def copy(self):
+        """Return copy of engine with same state."""
+        engine = Engine.__new__(Engine)
+        engine.delivery = self.delivery
+        engine.deck_count = self.deck_count
+        engine.ace = self.ace
+        engine.recall = self.recall[:]
+        engine.deck = self.deck[:]
+        engine.incoming = self.incoming[:]
+        engine.house = [pile[:] for pile in self.house]
+        engine.columns = [pile[:] for pile in self.columns]
+        engine.zones = [[engine.recall], [engine.deck], [engine.incoming], engine.house, engine.columns]
+        return engine
+
+    def key(self):
+        """Return hashable state of all piles."""
+        return tuple(bytes(pile) for rows in self.zones for pile in rows)
+
+    def rows(self, zone):
+        """Return all piles of zone."""
+        return self.zones[zone]
+
+    def pile(self, zone, row=0):
+        """Return pile of zone row."""
+        return self.zones[zone][row]
+
+    def won(self):
+        """Check all houses are collected to king."""
+        return all(pile and 13 == rate(pile[-1]) for pile in self.house)
+
+    def can_take(self, zone, row, index):
+        """Check cards from index to top of pile can be taken."""
+        if DECK == zone or (RECALL == zone and not self.deck):
+            return False
+        pile = self.zones[zone][row]
+        if not -len(pile) <= index < len(pile):
+            return False
+        cards = pile[index:]
+        return checker.change_suits(cards) and checker.rate_down(cards)
+
+    def can_put(self, cards, dst_zone, dst_row):
+        """Check cards can be put in house or columns row."""
+        target = self.zones[dst_zone][dst_row]
+        if HOUSE == dst_zone:
+            if 1 != len(cards):
+                return False
+            if self.ace == rate(cards[0]):
+                return not target
+            return bool(target) and suit(cards[0]) == suit(target[-1]) and rate(cards[0]) - 1 == rate(target[-1])
+        elif COLUMNS == dst_zone:
+            if not target:
+                return 13 == rate(cards[0])
+            return checker.change_suit(cards[0], target[-1]) and rate(cards[0]) + 1 == rate(target[-1])
+        return False
+
+    def put(self, zone, row, index, dst_zone, dst_row):
+        """Put cards from index to top of pile in house or columns row."""
+        if not self.can_take(zone, row, index):
+            return False
+        pile = self.zones[zone][row]
+        cards = pile[index:]
+        if not self.can_put(cards, dst_zone, dst_row):
+            return False
+        del pile[index:]
+        self.zones[dst_zone][dst_row].extend(cards)
+        self.__open(pile)
+        return True
+
+    def drop_row(self, card):
+        """Return house row for drop card or -1."""
+        for row, target in enumerate(self.house):
+            if self.ace == rate(card):
+                if not target:
+                    return row
+            elif target and suit(card) == suit(target[-1]) and rate(card) - 1 == rate(target[-1]):
+                return row
+        return -1
+
+    def drop(self, zone, row):
+        """Drop top card of pile in house, return house row or -1."""
+        pile = self.zones[zone][row]
+        if not pile:
+            return -1
+        house_row = self.drop_row(pile[-1])
+        if -1 != house_row:
+            self.house[house_row].append(pile.pop())
+            self.__open(pile)
+        return house_row
+
+    def drop_deck(self):
+        """Deal cards from deck in incoming, return dealt cards."""
+        if not self.deck:
+            return []
+        self.__close_incoming()
+        dealt = []
+        for _ in range(self.delivery):
+            if self.deck:
+                dealt.append(self.deck.pop() | Cards.FACE_UP)
+                self.incoming.append(dealt[-1])
+        return dealt
+
+    def drop_recall(self):
+        """Return all cards from recall in deck, return count cards."""
+        if self.deck or not self.recall:
+            return 0
+        self.__close_incoming()
+        count = len(self.recall)
+        self.deck.extend(reversed(self.recall))
+        self.recall.clear()
+        return count
+
+    def moves(self):
+        """Return all legal moves as tuples (kind, zone, row, index, dst_zone, dst_row)."""
+        moves = []
+        if self.deck:
+            moves.append((MOVE_DEAL, DECK, 0, -1, INCOMING, 0))
+        elif self.recall:
+            moves.append((MOVE_RECALL, RECALL, 0, -1, DECK, 0))
+        columns = self.__tops(self.columns, Cards.RATE | Cards.RED)
+        houses = self.__tops(self.house, Cards.SUIT | Cards.RATE)
+        for zone, rows in enumerate(self.zones):
+            if DECK == zone or (RECALL == zone and not self.deck):
+                continue
+            for row, pile in enumerate(rows):
+                if not pile:
+                    continue
+                card = pile[-1]
+                if HOUSE != zone and -1 != self.drop_row(card):
+                    moves.append((MOVE_DROP, zone, row, -1, HOUSE, self.drop_row(card)))
+                if HOUSE != zone:
+                    for dst_row in houses.get(None if self.ace == rate(card) else (card & Cards.SUIT) | (rate(card) - 1), []):
+                        moves.append((MOVE_PUT, zone, row, -1, HOUSE, dst_row))
+                for index in self.__take_indexes(zone, pile):
+                    card = pile[index]
+                    for dst_row in columns.get(None if 13 == rate(card) else (rate(card) + 1) | (~card & Cards.RED), []):
+                        if (zone, row) != (COLUMNS, dst_row):
+                            moves.append((MOVE_PUT, zone, row, index, COLUMNS, dst_row))
+        return moves
+
+    def apply(self, move):
+        """Apply move from moves list, return result."""
+        kind, zone, row, index, dst_zone, dst_row = move
+        if MOVE_PUT == kind:
+            return self.put(zone, row, index, dst_zone, dst_row)
+        elif MOVE_DROP == kind:
+            return -1 != self.drop(zone, row)
+        elif MOVE_DEAL == kind:
+            return bool(self.drop_deck())
+        return bool(self.drop_recall())
+
+    def __take_indexes(self, zone, pile):
+        """Return indexes of pile for take, in columns only open cards in sequence."""
+        indexes = [-1]
+        if COLUMNS == zone:
+            for index in range(-2, -len(pile) - 1, -1):
+                card = pile[index]
+                if not card & Cards.FACE_UP or not checker.change_suit(card, pile[index + 1]) or rate(card) - 1 != rate(pile[index + 1]):
+                    break
+                indexes.append(index)
+        return indexes
+
+    def __tops(self, rows, mask):
+        """Return rows by masked top card, empty rows are under None."""
+        tops = {}
+        for row, pile in enumerate(rows):
+            tops.setdefault(pile[-1] & mask if pile else None, []).append(row)
+        return tops
+
+    def __close_incoming(self):
+        """Move cards from incoming in recall closed."""
+        self.recall.extend(card & ~Cards.FACE_UP for card in self.incoming)
+        self.incoming.clear()
+
+    def __open(self, pile):
+        """Open top card of pile."""
+        if pile:
+            pile[-1] |= Cards.FACE_UP
@@ -7,7 +7,8 @@ Created on 03.09.2018
 
 """
 
-import pickle
+import collections
+import math
 import random
 import time
 
@@ -25,6 +26,16 @@ from constants import Colors
 from player import Actions
 from player import Player
 
+import processes
+
+from profiler import Profiler
+
+from replay import MoveLog
+
+from resources import Resources
+
+from speech import PRIORITY_HIGH
+from speech import PRIORITY_LOW
 from speech import Speech
 
 
@@ -32,65 +43,121 @@ class Game:
     """Main running class for game."""
 
     def __init__(self):
-        """Initialize running class."""
+        """Initialize running class, speech, sounds and svg of cards are loaded in background."""
         self.config = ConfigParser()
         self.config.read('settings.ini')
         self.size_x = self.config.getint('screen', 'size_x')
         self.size_y = self.config.getint('screen', 'size_y')
+        self.profiler = Profiler(self.config)
 
-        with open('languages.dat', 'rb') as lang_file:
-            self.phrases = pickle.load(lang_file)[self.config.get('total', 'language')]
+        with self.profiler.phase('phrases'):
+            self.resources = Resources()
+            self.phrases = self.resources.phrases(self.config.get('total', 'language'))
 
-        self.speech = Speech(self.config)
-        self.speech.speak(self.phrases['start'])
+        with self.profiler.phase('speech'):
+            self.speech = Speech(self.config)
+            self.speech.speak(self.phrases['start'])
 
-        pygame.init()
-        pygame.font.init()
-        pygame.mixer.init()
+        with self.profiler.phase('pygame'):
+            pygame.init()
+            pygame.font.init()
+            pygame.mixer.init()
 
-        self.screen = pygame.display.set_mode((self.size_x, self.size_y))
-        pygame.display.set_caption(self.phrases['solitaire'])
+        with self.profiler.phase('first frame'):
+            self.screen = pygame.display.set_mode((self.size_x, self.size_y))
+            pygame.display.set_caption(self.phrases['solitaire'])
+            self.screen.fill(Colors.DARKGREEN)
+            pygame.display.flip()
 
-        self.sounds = Sound(self.config.getfloat('audio', 'sound_volume'))
-        self.music = Music(self.config.getfloat('audio', 'music_volume'))
+        with self.profiler.phase('audio'):
+            self.sounds = Sound(self.config.getfloat('audio', 'sound_volume'))
+            self.music = Music(self.config.getfloat('audio', 'music_volume'))
 
-        self.board = Board(self.config, self.screen, self.sounds)
-        self.player = Player(self.board, self.speech, self.phrases)
+        with self.profiler.phase('board'):
+            self.board = Board(self.config, self.screen, self.sounds)
+            self.log = None
+            if self.config.getboolean('log', 'enabled'):
+                self.log = MoveLog(self.config.get('log', 'file'), self.config.getint('log', 'max_size') * 1024 * 1024)
+            self.player = Player(self.board, self.speech, self.phrases, self.resources.card_names(self.config.get('total', 'language')), self.log)
         self.game_over = True
         self.win = False
         self.STOPPED_PLAYING = pygame.USEREVENT + 1
 
-        pygame.mixer.music.set_endevent(self.STOPPED_PLAYING)
-        self.fontObj = pygame.font.SysFont('arial', 50)
+        with self.profiler.phase('fonts'):
+            pygame.mixer.music.set_endevent(self.STOPPED_PLAYING)
+            self.fontObj = pygame.font.SysFont('arial', 50)
+            self.overlayFont = pygame.font.SysFont('arial', 14)
         self.clock = pygame.time.Clock()
-
-        random.seed()
-        self.music_play()
-        self.new_game()
+        self.fps = self.config.getint('screen', 'fps')
+        self.idle_timeout = self.config.getfloat('screen', 'idle_timeout')
+        if self.idle_timeout <= 0:
+            raise ValueError('idle_timeout in settings must be greater than 0')
+        self.overlay_rect = None
+        self.repaint = True
+        self.narration = collections.deque()
+        self.narration_time = 0
+
+        with self.profiler.phase('new game'):
+            random.seed()
+            self.music_play()
+            self.new_game()
 
     def mainloop(self):
         """Run main loop game."""
         self.running = True
-        while self.running:
-            self.handle_events()
-            self.draw()
-
-            self.clock.tick(15)
-            pygame.display.flip()
-
-        self.speech.speak(self.phrases['finish'])
+        events = []
+        try:
+            while self.running:
+                self.profiler.start()
+                start = time.perf_counter()
+                self.handle_events(events + pygame.event.get())
+                self.profiler.add('events', start)
+                self.narrate()
+                self.board.animate()
+                self.draw()
+                self.profiler.output(self.speech.output_time)
+                self.profiler.stop()
+
+                events = self.wait()
+        finally:
+            if self.log is not None:
+                self.log.close()
+
+        self.speech.speak(self.phrases['finish'], PRIORITY_HIGH)
         self.speech.finish()
+        if self.profiler.enabled:
+            self.dump_profile()
+        processes.close_pool()
         pygame.quit()
 
-    def handle_events(self):
+    def wait(self):
+        """Wait next frame with fps while deal is playing, else sleep until event or narration, return events."""
+        if self.board.animation:
+            self.clock.tick(self.fps)
+            return []
+        timeout = self.idle_timeout
+        if self.narration:
+            timeout = min(timeout, max(self.narration_time - time.perf_counter(), 0))
+        event = pygame.event.wait(max(1, math.ceil(timeout * 1000)))
+        return [] if pygame.NOEVENT == event.type else [event]
+
+    def handle_events(self, events):
         """Check all game events."""
-        for event in pygame.event.get():
+        for event in events:
             if pygame.QUIT == event.type:
                 self.running = False
+            if pygame.VIDEOEXPOSE == event.type:
+                self.repaint = True
             if self.STOPPED_PLAYING == event.type:
                 self.music_play()
             elif pygame.KEYDOWN == event.type:
-                if pygame.K_ESCAPE == event.key:
+                self.speech.interrupt()
+                self.profiler.key()
+                if pygame.K_ESCAPE == event.key and (self.narration or time.perf_counter() < self.narration_time):
+                    self.narration.clear()
+                    self.narration_time = 0
+                    self.speech.silence()
+                elif pygame.K_ESCAPE == event.key:
                     self.running = False
                 elif pygame.K_F1 == event.key:
                     self.help()
@@ -102,49 +169,107 @@ class Game:
                     self.change_deck()
                 elif pygame.K_F5 == event.key:
                     self.new_game()
+                elif pygame.K_F6 == event.key:
+                    self.change_winnable()
                 elif pygame.K_F9 == event.key:
                     self.change_language()
+                elif pygame.K_F11 == event.key and self.profiler.enabled:
+                    self.change_overlay()
+                elif pygame.K_F12 == event.key and self.profiler.enabled:
+                    self.dump_profile()
                 elif pygame.K_TAB == event.key and pygame.key.get_mods() & pygame.KMOD_SHIFT:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeZoneDown)
+                        self.actions(Actions.ChangeZoneDown)
                 elif pygame.K_TAB == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeZoneUp)
+                        self.actions(Actions.ChangeZoneUp)
                 elif pygame.K_LEFT == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeRowDown)
+                        self.actions(Actions.ChangeRowDown)
                 elif pygame.K_RIGHT == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeRowUp)
+                        self.actions(Actions.ChangeRowUp)
                 elif pygame.K_UP == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeCardUp)
+                        self.actions(Actions.ChangeCardUp)
                 elif pygame.K_DOWN == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.ChangeCardDown)
+                        self.actions(Actions.ChangeCardDown)
                 elif pygame.K_SPACE == event.key and pygame.key.get_mods() & pygame.KMOD_SHIFT:
                     if not self.game_over:
-                        self.player.actions(Actions.Drop)
+                        self.actions(Actions.Drop)
                         self.check_win()
                 elif pygame.K_SPACE == event.key:
                     if not self.game_over:
-                        self.player.actions(Actions.Take)
+                        self.actions(Actions.Take)
                         self.check_win()
 
+    def actions(self, action):
+        """Run action of player with timing in profiler."""
+        start = time.perf_counter()
+        self.player.actions(action)
+        self.profiler.add('actions', start)
+
+    def dump_profile(self):
+        """Write data of profiler with spans of background initialization."""
+        spans = [('speech backend', self.speech.init_span), ('sounds decode', self.sounds.decode_span), ('svg parse', self.board.textures.parse_span)]
+        self.profiler.dump(self.speech.stats(), spans)
+
     def draw(self):
-        """Main draw function."""
-        self.screen.fill(Colors.DARKGREEN)
-        self.board.draw()
+        """Main draw function, update only changed rects on display."""
+        start = time.perf_counter()
+        rects = []
+        if self.repaint:
+            self.repaint = False
+            self.screen.fill(Colors.DARKGREEN)
+            self.board.repaint()
+            rects.append(self.screen.get_rect())
+        if self.overlay_rect is not None:
+            rects.append(self.clear_overlay())
+        if not self.game_over:
+            self.player.update()
+        rects.extend(self.board.draw())
         if self.game_over:
-            if self.win:
-                textSurfaceObj = self.fontObj.render(self.phrases['win'], True, Colors.GREEN)
-            else:
-                textSurfaceObj = self.fontObj.render(self.phrases['game_over'], True, Colors.RED)
-            textRectObj = textSurfaceObj.get_rect()
-            textRectObj.center = (self.size_x//2, self.size_y//2)
-            self.screen.blit(textSurfaceObj, textRectObj)
+            if rects:
+                if self.win:
+                    textSurfaceObj = self.fontObj.render(self.phrases['win'], True, Colors.GREEN)
+                else:
+                    textSurfaceObj = self.fontObj.render(self.phrases['game_over'], True, Colors.RED)
+                textRectObj = textSurfaceObj.get_rect()
+                textRectObj.center = (self.size_x//2, self.size_y//2)
+                self.screen.blit(textSurfaceObj, textRectObj)
+                rects.append(textRectObj)
         else:
-            self.player.draw()
+            rects.extend(self.player.draw(rects))
+        if self.profiler.overlay:
+            rects.extend(self.draw_overlay())
+        self.profiler.add('draw', start)
+        start = time.perf_counter()
+        if rects:
+            pygame.display.update(rects)
+        self.profiler.add('flip', start)
+
+    def draw_overlay(self):
+        """Draw summary of profiler in bottom left corner and return dirty rects."""
+        lines = self.profiler.summary(self.speech.stats())
+        surfaces = [self.overlayFont.render(line, True, Colors.WHITE) for line in lines]
+        height = sum(surface.get_height() for surface in surfaces)
+        top = self.size_y - height
+        self.overlay_rect = pygame.Rect(0, top, max(surface.get_width() for surface in surfaces), height)
+        self.screen.fill(Colors.BLACK, self.overlay_rect)
+        for surface in surfaces:
+            self.screen.blit(surface, (0, top))
+            top += surface.get_height()
+        return [self.overlay_rect]
+
+    def clear_overlay(self):
+        """Clear place of overlay and mark zones under it for redraw, return cleared rect."""
+        rect, self.overlay_rect = self.overlay_rect, None
+        self.screen.fill(Colors.DARKGREEN, rect)
+        for zone in self.board.zones:
+            if rect.colliderect(zone.get_rect()):
+                zone.update(rect.move(-zone.LEFT, -zone.TOP))
+        return rect
 
     def music_play(self):
         """Change music play."""
@@ -154,20 +279,21 @@ class Game:
 
     def check_win(self):
         """Check win game."""
-        all_kings = 0
-        for row in self.board.zones[3].rows:
-            if row and 'king' == row[-1].rate:
-                all_kings += 1
-        if 4 == all_kings:
+        if self.board.engine.won():
             self.game_over = True
             self.win = True
-            self.speech.speak(self.phrases['win'])
+            self.repaint = True
+            self.speech.speak(self.phrases['win'], PRIORITY_HIGH)
 
     def new_game(self):
         """Start new game."""
         self.speech.speak(self.phrases['new_game'])
         self.game_over = False
         self.win = False
+        self.repaint = True
+        if not self.check_winnable():
+            with open('settings.ini', 'w') as config_file:
+                self.config.write(config_file)
         self.board.create_deck()
         self.board.clear_zones()
         self.board.distribution()
@@ -175,16 +301,18 @@ class Game:
         self.player.speak()
 
     def help(self):
-        """Speak help for keys control game."""
-        language = self.config.get('total', 'language')
-        with open('help.dat', 'rb') as help_file:
-            data = pickle.load(help_file)
-            for line in [line for line in data[language] if '\n' != line]:
-                self.speech.speak(line)
-
-                shift = len(line) // 5
-                timeout = shift * 0.3
-                time.sleep(timeout)
+        """Start narration of help for keys control game."""
+        self.narration.clear()
+        self.narration.extend(self.resources.help(self.config.get('total', 'language')))
+        self.narration_time = 0
+
+    def narrate(self):
+        """Speak next line of narration when time of previous line is over."""
+        now = time.perf_counter()
+        if self.narration and now >= self.narration_time:
+            line = self.narration.popleft()
+            self.speech.speak(line, PRIORITY_LOW)
+            self.narration_time = now + len(line) // 5 * 0.3
 
     def change_music(self):
         """On or off music in game."""
@@ -221,17 +349,39 @@ class Game:
         with open('settings.ini', 'w') as config_file:
             self.config.write(config_file)
 
+    def change_winnable(self):
+        """On or off deals only from index of winnable deals."""
+        if self.config.getboolean('board', 'winnable'):
+            self.config.set('board', 'winnable', 'false')
+            self.speech.speak(self.phrases['winnable_off'])
+        else:
+            self.config.set('board', 'winnable', 'true')
+            if self.check_winnable():
+                self.speech.speak(self.phrases['winnable_on'])
+        with open('settings.ini', 'w') as config_file:
+            self.config.write(config_file)
+
+    def change_overlay(self):
+        """Show or hide overlay with summary of profiler."""
+        self.profiler.overlay = not self.profiler.overlay
+
+    def check_winnable(self):
+        """Turn off winnable mode if index of winnable deals for game is empty, return False if mode was turned off."""
+        if self.config.getboolean('board', 'winnable') and 0 == len(self.board.deals_index()):
+            self.config.set('board', 'winnable', 'false')
+            self.speech.speak(self.phrases['winnable_none'])
+            return False
+        return True
+
     def change_language(self):
         """Change language for phrases."""
         if 'ru' == self.config.get('total', 'language'):
             self.config.set('total', 'language', 'en')
-            with open('languages.dat', 'rb') as lang_file:
-                self.phrases = pickle.load(lang_file)['en']
         else:
             self.config.set('total', 'language', 'ru')
-            with open('languages.dat', 'rb') as lang_file:
-                self.phrases = pickle.load(lang_file)['ru']
+        self.phrases = self.resources.phrases(self.config.get('total', 'language'))
         self.player.phrases = self.phrases
+        self.player.card_names = self.resources.card_names(self.config.get('total', 'language'))
         self.speech.speak(self.phrases['language'])
         with open('settings.ini', 'w') as config_file:
             self.config.write(config_file)
@@ -1,15 +1,23 @@
 pyinstaller -F --noconsole ^
 --add-data VERSION;. ^
 --add-binary audio.pyd;. ^
+--add-binary batch.pyd;. ^
 --add-binary board.pyd;. ^
 --add-binary card.pyd;. ^
 --add-binary checker.pyd;. ^
 --add-binary constants.pyd;. ^
+--add-binary deals.pyd;. ^
+--add-binary engine.pyd;. ^
 --add-binary game.pyd;. ^
 --add-binary loader.pyd;. ^
 --add-binary player.pyd;. ^
 --add-binary processes.pyd;. ^
+--add-binary profiler.pyd;. ^
+--add-binary replay.pyd;. ^
+--add-binary resources.pyd;. ^
+--add-binary solver.pyd;. ^
 --add-binary speech.pyd;. ^
+--add-binary textures.pyd;. ^
 --add-binary Tolk.pyd;. ^
 --add-binary zones.pyd;. ^
 --hidden-import pygame ^
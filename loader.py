@@ -7,48 +7,208 @@ Created on 15.10.2018
 
 """
 
-import pickle
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
 
-import processes
+import pygame
 
 
-def textures(svg_cards, svg_start_pos, svg_card_size, defs_dict, card_x, card_y):
-    """Load textures from svg or cache."""
+CACHE_DIR = 'cache'
+ATLAS_MAGIC = b'SOLATLAS'
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct('<8sHI')
+ATLAS_COLS = 13
+KEY_EXT = '.key'
+PACK_MAGIC = b'SOLPACK\x00'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('<8sHI')
+
+
+def svg_key(svg_name):
+    """Return hash of svg file for cache key, hash is read again only if size or mtime of file changed."""
+    stat = os.stat(svg_name)
+    fingerprint = [stat.st_size, stat.st_mtime_ns]
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            base, ext = os.path.splitext(name)
+            if KEY_EXT == ext:
+                try:
+                    with open(os.path.join(CACHE_DIR, name), 'r') as key_file:
+                        if json.load(key_file) == fingerprint:
+                            return base
+                except (IOError, ValueError):
+                    continue
+    with open(svg_name, 'rb') as svg_file:
+        key = hashlib.sha1(svg_file.read()).hexdigest()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, key + KEY_EXT), 'w') as key_file:
+        json.dump(fingerprint, key_file)
+    return key
+
+
+def atlas_name(key, card_x, card_y):
+    """Return file name atlas for key and size."""
+    return os.path.join(CACHE_DIR, '{}_{}x{}.dat'.format(key, card_x, card_y))
+
+
+def atlas_sizes(key):
+    """Return sizes all cached atlases for key."""
+    sizes = []
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            base, ext = os.path.splitext(name)
+            if name.startswith(key + '_') and '.dat' == ext:
+                sizes.append(tuple(int(size) for size in base[len(key) + 1:].split('x')))
+    return sizes
+
+
+def load_atlas(atlas_name, key, card_x, card_y):
+    """Load textures from atlas file as subsurfaces of one sheet."""
+    with open(atlas_name, 'rb') as atlas_file:
+        data = atlas_file.read()
+    magic, version, header_size = ATLAS_HEADER.unpack_from(data)
+    if ATLAS_MAGIC != magic or ATLAS_VERSION != version:
+        raise ValueError('unknown atlas format')
+    header = json.loads(data[ATLAS_HEADER.size:ATLAS_HEADER.size + header_size].decode('utf-8'))
+    if (header['key'] != key) or (header['card_x'] != card_x) or (header['card_y'] != card_y):
+        raise ValueError('atlas is stale')
+    pixels = memoryview(data)[ATLAS_HEADER.size + header_size:]
+    sheet = pygame.image.frombuffer(pixels, header['size'], 'RGBA')
+    return {name: sheet.subsurface(rect) for name, rect in header['rects'].items()}
+
+
+def save_atlas(atlas_name, key, textures_dict, card_x, card_y):
+    """Write textures in atlas file: one raw RGBA sheet with index sub-rects."""
+    rows = (len(textures_dict) + ATLAS_COLS - 1) // ATLAS_COLS
+    sheet = pygame.Surface((ATLAS_COLS * card_x, rows * card_y), pygame.SRCALPHA)
+    rects = {}
+    for index, (name, tex) in enumerate(textures_dict.items()):
+        rect = (index % ATLAS_COLS * card_x, index // ATLAS_COLS * card_y, card_x, card_y)
+        sheet.blit(tex, rect[:2])
+        rects[name] = rect
+    header = json.dumps({'key': key, 'card_x': card_x, 'card_y': card_y, 'size': sheet.get_size(), 'rects': rects}).encode('utf-8')
+    temp_name = atlas_name + '.tmp'
+    with open(temp_name, 'wb') as save_file:
+        save_file.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(header)))
+        save_file.write(header)
+        save_file.write(pygame.image.tostring(sheet, 'RGBA'))
+    os.replace(temp_name, atlas_name)
+
+
+def cached_textures(key, card_x, card_y, cache_size):
+    """Load textures from atlas or scale from nearest larger atlas and evict atlases over cache size, return empty dict if not found."""
+    name = atlas_name(key, card_x, card_y)
+    sizes = sorted((size for size in atlas_sizes(key) if size[0] >= card_x and size[1] >= card_y), key=lambda size: size[0] * size[1])
+    for size in sizes:
+        try:
+            raster = load_atlas(atlas_name(key, *size), key, *size)
+        except (IOError, ValueError, KeyError, struct.error, pygame.error):
+            continue
+        os.utime(atlas_name(key, *size))
+        if (card_x, card_y) == size:
+            return raster
+        result = {tex_name: pygame.transform.smoothscale(tex, (card_x, card_y)) for tex_name, tex in raster.items()}
+        cache_atlas(name, key, result, card_x, card_y)
+        evict_atlases(name, cache_size)
+        return result
+    return {}
+
+
+def cache_atlas(name, key, textures_dict, card_x, card_y):
+    """Merge textures in atlas cache and remove atlases of other svg."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for file_name in os.listdir(CACHE_DIR):
+        if not file_name.startswith(key):
+            os.remove(os.path.join(CACHE_DIR, file_name))
     try:
-        cache_file = open('cache.dat', 'rb')
-    except IOError as e:
-        pass
-    else:
-        with cache_file:
-            cache = pickle.load(cache_file)
-            if (cache['card_x'] == card_x) and (cache['card_y'] == card_y):
-                cache.pop('card_x')
-                cache.pop('card_y')
-                data = [(name, png) for name, png in cache.items()]
-                return processes.png2tex(data, card_x, card_y)
-    data = processes.svg2png(svg_cards, svg_start_pos, svg_card_size, defs_dict)
-    __cacher(data, card_x, card_y)
-    return processes.png2tex(data, card_x, card_y)
-
-
-def __cacher(data, card_x, card_y):
-    """Write data in cache."""
-    with open('cache.dat', 'wb') as save_file:
-        cache = {name: png for name, png in data}
-        cache['card_x'] = card_x
-        cache['card_y'] = card_y
-        pickle.dump(cache, save_file)
-
-
-def sounds(volume):
-    """Load sounds wav data from binary file."""
-    with open('sounds.dat', 'rb') as file_data:
-        wavs = pickle.load(file_data)
-        data = [(name, wav) for name, wav in wavs.items()]
-        return processes.sounds(data, volume)
+        old = load_atlas(name, key, card_x, card_y)
+    except (IOError, ValueError, KeyError, struct.error, pygame.error):
+        old = {}
+    old.update(textures_dict)
+    save_atlas(name, key, old, card_x, card_y)
+
+
+def evict_atlases(keep_name, cache_size):
+    """Remove least recently used atlases over cache size in bytes, other files of cache are kept."""
+    names = [os.path.join(CACHE_DIR, name) for name in os.listdir(CACHE_DIR) if '.dat' == os.path.splitext(name)[1]]
+    names.sort(key=os.path.getmtime, reverse=True)
+    total = os.path.getsize(keep_name)
+    for name in names:
+        if name == keep_name:
+            continue
+        size = os.path.getsize(name)
+        if total + size > cache_size:
+            os.remove(name)
+        else:
+            total += size
+
+
+def sounds():
+    """Open sounds pack file, return memory map and index of wav sounds."""
+    return open_pack('sounds.dat')
 
 
 def music():
-    """Load music from binary file."""
-    with open('music.dat', 'rb') as file_data:
-        return pickle.load(file_data)
+    """Open music pack file, return memory map and index of tracks."""
+    return open_pack('music.dat')
+
+
+class PackItem(io.RawIOBase):
+    """Read only file object over item in memory map of pack, data is not copied."""
+
+    def __init__(self, pack_map, offset, size):
+        """Initialize item file object."""
+        super().__init__()
+        self.__view = memoryview(pack_map)[offset:offset + size]
+        self.__position = 0
+
+    def readable(self):
+        """Item is readable."""
+        return True
+
+    def seekable(self):
+        """Item is seekable."""
+        return True
+
+    def readinto(self, buffer):
+        """Read data from current position in buffer."""
+        count = max(0, min(len(buffer), len(self.__view) - self.__position))
+        buffer[:count] = self.__view[self.__position:self.__position + count]
+        self.__position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Change current position."""
+        if io.SEEK_CUR == whence:
+            offset += self.__position
+        elif io.SEEK_END == whence:
+            offset += len(self.__view)
+        self.__position = max(0, offset)
+        return self.__position
+
+    def tell(self):
+        """Return current position."""
+        return self.__position
+
+    def close(self):
+        """Release view of memory map."""
+        if not self.closed:
+            self.__view.release()
+        super().close()
+
+
+def open_pack(name):
+    """Open pack file, return memory map and index of items as name: (offset, size)."""
+    with open(name, 'rb') as pack_file:
+        pack_map = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, header_size = PACK_HEADER.unpack_from(pack_map)
+    if PACK_MAGIC != magic or PACK_VERSION != version:
+        pack_map.close()
+        raise ValueError('unknown pack format')
+    start = PACK_HEADER.size + header_size
+    index = json.loads(pack_map[PACK_HEADER.size:start].decode('utf-8'))
+    return pack_map, {item: (start + offset, size) for item, (offset, size) in index.items()}
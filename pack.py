@@ -0,0 +1,58 @@
+"""
+Writer of pack files with music and sounds.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python pack.py sounds.dat deal.wav open.wav
+
+"""
+
+import json
+import os
+import sys
+
+import loader
+
+
+def read_pack(name):
+    """Return items of pack file as name: data, empty dict if file is not found."""
+    if not os.path.isfile(name):
+        return {}
+    pack_map, index = loader.open_pack(name)
+    try:
+        return {item: pack_map[offset:offset + size] for item, (offset, size) in index.items()}
+    finally:
+        pack_map.close()
+
+
+def save_pack(name, items):
+    """Write pack file: header, index of offsets and data of items one by one."""
+    index = {}
+    offset = 0
+    for item, data in items.items():
+        index[item] = (offset, len(data))
+        offset += len(data)
+    header = json.dumps(index).encode('utf-8')
+    temp_name = name + '.tmp'
+    with open(temp_name, 'wb') as pack_file:
+        pack_file.write(loader.PACK_HEADER.pack(loader.PACK_MAGIC, loader.PACK_VERSION, len(header)))
+        pack_file.write(header)
+        for data in items.values():
+            pack_file.write(data)
+    os.replace(temp_name, name)
+
+
+def add_files(name, file_names):
+    """Add files in pack under their names without extension, items with same names are replaced."""
+    items = read_pack(name)
+    for file_name in file_names:
+        with open(file_name, 'rb') as data_file:
+            items[os.path.splitext(os.path.basename(file_name))[0]] = data_file.read()
+    save_pack(name, items)
+
+
+if __name__ == '__main__':
+    add_files(sys.argv[1], sys.argv[2:])
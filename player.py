@@ -9,8 +9,6 @@ Created on 19.10.2018
 
 import enum
 
-import checker
-
 from constants import Colors
 
 import pygame
@@ -22,11 +20,13 @@ Actions = enum.Enum('Actions', 'ChangeZoneUp ChangeZoneDown ChangeRowUp ChangeRo
 class Player:
     """Player class for solitaire."""
 
-    def __init__(self, board, speech, phrases):
-        """Initialize player class."""
+    def __init__(self, board, speech, phrases, card_names, log=None):
+        """Initialize player class, actions are written in log if it is set."""
         self.board = board
         self.speech = speech
         self.phrases = phrases
+        self.card_names = card_names
+        self.log = log
         self.color = Colors.BLUE
         self.__actions = [self.__change_zone, self.__change_row, self.__change_card, self.__take, self.__drop]
 
@@ -35,15 +35,36 @@ class Player:
         self.current_zone = 0
         self.__took = False
         self.take_card = None
+        self.cursor = None
+        self.cursor_zone = 0
+        if self.log is not None:
+            self.log.game(self.board.seed, self.board.deck_count, self.board.delivery)
 
-    def draw(self):
-        """Draw method for player."""
+    def get_cursor(self):
+        """Return rect cursor on board."""
         zone = self.board.zones[self.current_zone]
         if zone.if_empty():
             left, top = zone.get_coord_zero(zone.current_row)
         else:
-            left, top = zone.get_coord_card(zone.current_row, zone.current_card)
-        pygame.draw.rect(zone.zone, self.color, (left, top, self.board.card_x, self.board.card_y), 1)
+            cards = zone.rows[zone.current_row] if zone.if_rows else zone.cards
+            left, top = zone.get_coord_card(zone.current_row, zone.current_card % len(cards))
+        return pygame.Rect(zone.LEFT + left, zone.TOP + top, self.board.card_x, self.board.card_y)
+
+    def update(self):
+        """Mark place under old cursor for redraw if cursor moved."""
+        if self.cursor is not None and self.cursor != self.get_cursor():
+            zone = self.board.zones[self.cursor_zone]
+            zone.update(self.cursor.move(-zone.LEFT, -zone.TOP))
+
+    def draw(self, rects):
+        """Draw cursor on board and return dirty rects."""
+        cursor = self.get_cursor()
+        if cursor == self.cursor and -1 == cursor.collidelist(rects):
+            return []
+        self.cursor = cursor
+        self.cursor_zone = self.current_zone
+        pygame.draw.rect(self.board.screen, self.color, cursor, 1)
+        return [cursor]
 
     def speak(self, changed_zone=False):
         """Speak information for moving cell."""
@@ -64,21 +85,19 @@ class Player:
             self.speech.speak(self.phrases['empty'])
         else:
             if card.status:
-                if 52 == self.board.deck_count:
-                    rate = str(card.rate_index) if 1 < card.rate_index < 11 else self.phrases[card.rate]
-                else:
-                    rate = str(card.rate_index) if card.rate_index < 11 else self.phrases[card.rate]
-                    if 'ace' == card.rate:
-                        rate = self.phrases[card.rate]
-                self.speech.speak(' '.join((rate, self.phrases[card.suit])))
+                self.speech.speak(self.card_names[self.board.deck_count][card.code])
             else:
                 self.speech.speak(self.phrases['close'])
 
     def actions(self, action):
         """Run actions in zones."""
+        if self.log is not None:
+            self.log.action(action)
         zone = self.board.zones[self.current_zone]
         for method_action in self.__actions:
             method_action(action, zone)
+        if action in (Actions.Take, Actions.Drop):
+            self.board.update()
 
     def __change_zone(self, action, zone):
         """Change zone up or down."""
@@ -147,27 +166,22 @@ class Player:
                 if zone.if_empty() and not self.__took:
                     return
                 if self.__took:
-                    if 'house' == zone.NAME:
-                        result = self.board.zones[3].take(self.__take_cards, self.__take_cards_list)
-                        if result and len(self.__take_cards_list) > 0:
-                            self.__open_card(self.__take_cards_list[-1])
-                        self.__took = False
-                        self.take_card.take = False
-                    elif 'columns' == zone.NAME:
-                        result = self.board.zones[4].take(self.__take_cards, self.__take_cards_list)
-                        if result and len(self.__take_cards_list) > 0:
-                            self.__open_card(self.__take_cards_list[-1])
-                        self.__took = False
-                        self.take_card.take = False
-                    else:
-                        self.__took = False
-                        self.take_card.take = False
+                    if zone.NAME in ('house', 'columns'):
+                        take_zone, take_row = self.__take_place
+                        cards = self.__get_cards(take_zone, take_row)
+                        if self.take_card in cards:
+                            index = cards.index(self.take_card)
+                            if self.board.engine.put(take_zone, take_row, index, self.current_zone, zone.current_row):
+                                self.board.sync()
+                                if cards:
+                                    self.__open_card(cards[-1])
+                    self.__took = False
+                    self.take_card.take = False
                 else:
-                    cards = zone.rows[zone.current_row] if zone.if_rows else zone.cards
                     card = zone.get_card(zone.current_card)
-                    self.__take_cards = cards[cards.index(card):]
-                    if checker.change_suits(self.__take_cards) and checker.rate_down(self.__take_cards):
-                        self.__take_cards_list = cards
+                    cards = self.__get_cards(self.current_zone, zone.current_row)
+                    if self.board.engine.can_take(self.current_zone, zone.current_row, cards.index(card)):
+                        self.__take_place = (self.current_zone, zone.current_row)
                         self.__took = True
                         self.take_card = card
                         self.take_card.take = True
@@ -179,29 +193,15 @@ class Player:
         if Actions.Drop == action:
             if zone.if_empty():
                 return
-            cards = zone.rows[zone.current_row] if zone.if_rows else zone.cards
             card = zone.get_card(zone.current_card)
-            rate_index = card.rate_index
             if card == zone.get_card(-1):
-                if 'ace' == card.rate:
-                    for row in range(len(self.board.zones[3].rows)):
-                        if not self.board.zones[3].rows[row]:
-                            self.board.zones[3].rows[row].append(cards.pop())
-                            if cards:
-                                self.__open_card(cards[-1])
-                            else:
-                                self.__speak_card()
-                            return
-                for row in range(len(self.board.zones[3].rows)):
-                    row_cards = self.board.zones[3].rows[row]
-                    if row_cards:
-                        if card.suit == row_cards[-1].suit and rate_index - 1 == row_cards[-1].rate_index:
-                            row_cards.append(cards.pop())
-                            if cards:
-                                self.__open_card(cards[-1])
-                            else:
-                                self.__speak_card()
-                            return
+                if -1 != self.board.engine.drop(self.current_zone, zone.current_row):
+                    self.board.sync()
+                    cards = self.__get_cards(self.current_zone, zone.current_row)
+                    if cards:
+                        self.__open_card(cards[-1])
+                    else:
+                        self.__speak_card()
 
     def __drop_recall(self, action, zone):
         """Dropped cards from recall."""
@@ -209,12 +209,13 @@ class Player:
             if zone.if_empty():
                 self.__speak_card()
                 return True
-            while not self.board.zones[2].if_empty():
-                card = self.board.zones[2].cards.pop(0)
-                self.board.zones[0].cards.append(card)
-                self.__open_card(card, False)
-            while not zone.if_empty():
-                self.board.zones[1].cards.append(zone.cards.pop())
+            self.__cancel_take()
+            closed = len(self.board.zones[2].cards)
+            count = self.board.engine.drop_recall()
+            self.board.sync()
+            for _ in range(closed):
+                self.__open_card(None, False)
+            for _ in range(count):
                 self.board.sounds.play('deal')
             self.__speak_card()
             return True
@@ -226,22 +227,31 @@ class Player:
             if zone.if_empty():
                 self.__speak_card()
                 return True
-            while not self.board.zones[2].if_empty():
-                card = self.board.zones[2].cards.pop(0)
-                self.board.zones[0].cards.append(card)
-                self.__open_card(card, False)
-            for _ in range(self.board.delivery):
-                if not zone.if_empty():
-                    card = zone.cards.pop()
-                    self.board.zones[2].cards.append(card)
-                    self.__open_card(card)
+            self.__cancel_take()
+            closed = len(self.board.zones[2].cards)
+            dealt = self.board.engine.drop_deck()
+            self.board.sync()
+            for _ in range(closed):
+                self.__open_card(None, False)
+            for card in self.board.zones[2].cards[len(self.board.zones[2].cards) - len(dealt):]:
+                self.__open_card(card)
             self.__speak_card()
             return True
         return False
 
+    def __cancel_take(self):
+        """Cancel took cards if cards moved from place."""
+        if self.__took:
+            self.__took = False
+            self.take_card.take = False
+
+    def __get_cards(self, zone_index, row):
+        """Return cards of zone row."""
+        zone = self.board.zones[zone_index]
+        return zone.rows[row] if zone.if_rows else zone.cards
+
     def __open_card(self, card, open_flag=True):
-        """Open card or close if open_flag = False."""
-        card.status = open_flag
+        """Play sound open or close card and speak opened card."""
         self.board.sounds.play('open')
         if open_flag:
             self.__speak_card(card)
@@ -12,11 +12,13 @@ import math
 import multiprocessing
 import multiprocessing.pool
 import os
+import signal
 import sys
+import threading
 if getattr(sys, 'frozen', False):
-    os.environ['path'] += os.pathsep + os.path.join(os.path.dirname(sys.executable), 'gtk')
+    os.environ['PATH'] = os.environ.get('PATH', '') + os.pathsep + os.path.join(os.path.dirname(sys.executable), 'gtk')
 else:
-    os.environ['path'] += os.pathsep + os.path.join(os.getcwd(), 'gtk')
+    os.environ['PATH'] = os.environ.get('PATH', '') + os.pathsep + os.path.join(os.getcwd(), 'gtk')
 
 import xml.etree.ElementTree as etree
 
@@ -27,20 +29,64 @@ import cairosvg
 import pygame
 
 
-def __thread_svg2png(svg_string, svg_start_pos, svg_card_size, defs_string):
+XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+
+__defs = []
+__defs_owner = {}
+__defs_string = None
+__defs_lock = threading.Lock()
+__pool = None
+__pool_defs = None
+
+
+def __init_svg2png(defs_string):
+    """Parse svg defs once in process, defs string is published last for threads which check it without lock."""
+    global __defs, __defs_owner, __defs_string
+    defs = [etree.fromstring(obj) for obj in defs_string]
+    defs_owner = {}
+    for index, obj in enumerate(defs):
+        for elem in obj.iter():
+            if 'id' in elem.attrib:
+                defs_owner[elem.attrib['id']] = index
+    __defs = defs
+    __defs_owner = defs_owner
+    __defs_string = defs_string
+
+
+def __init_process(defs_string):
+    """Restore default signal handlers inherited from pygame, so terminate stops process, and parse svg defs."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    __init_svg2png(defs_string)
+
+
+def __used_defs(svg):
+    """Return defs linked from svg element and from linked defs."""
+    used = set()
+    stack = [svg]
+    while stack:
+        for elem in stack.pop().iter():
+            href = elem.attrib.get(XLINK_HREF, '')
+            index = __defs_owner.get(href[1:]) if href.startswith('#') else None
+            if index is not None and index not in used:
+                used.add(index)
+                stack.append(__defs[index])
+    return [__defs[index] for index in sorted(used)]
+
+
+def __thread_svg2png(svg_string, svg_start_pos, svg_card_size):
         """Convert svg to png."""
         root = etree.Element('svg')
         root.set('version', '1.1')
         root.set('width', str(int(math.ceil(svg_card_size[0]))))
         root.set('height', str(int(math.ceil(svg_card_size[1]))))
         defs = etree.SubElement(root, 'defs')
-        for obj in defs_string:
-            defs.append(etree.fromstring(obj))
         g = etree.SubElement(root, 'g')
         svg = etree.fromstring(svg_string)
+        defs.extend(__used_defs(svg))
         offset_x, offset_y = 0, 0
         for elem in svg.findall('./'):
-            if ('{http://www.w3.org/2000/svg}use' == elem.tag) and ('#base' == elem.attrib['{http://www.w3.org/1999/xlink}href']):
+            if ('{http://www.w3.org/2000/svg}use' == elem.tag) and ('#base' == elem.attrib[XLINK_HREF]):
                 offset_x = float(elem.attrib['x'])
                 offset_y = float(elem.attrib['y'])
                 break
@@ -50,6 +96,11 @@ def __thread_svg2png(svg_string, svg_start_pos, svg_card_size, defs_string):
         return (svg.attrib['id'], png)
 
 
+def __task_svg2png(args):
+    """Unpack arguments task for convert svg to png."""
+    return __thread_svg2png(*args)
+
+
 def __thread_png2tex(data, card_x, card_y):
     """Convert png file object in pygame surface with need sizes."""
     png = io.BytesIO(data[1])
@@ -58,19 +109,43 @@ def __thread_png2tex(data, card_x, card_y):
     return (data[0], pygame.transform.scale(image, (card_x, card_y)))
 
 
-def __thread_sound(data, volume):
-    """Create pygame Sound object."""
-    wav = pygame.mixer.Sound(data[1])
-    wav.set_volume(volume)
-    return (data[0], wav)
+def defs2string(defs_dict):
+    """Return serialized svg defs for svg2png, defs are serialized once per parsed svg."""
+    return tuple(etree.tostring(obj) for obj in defs_dict.values())
 
 
-def svg2png(svg_cards, svg_start_pos, svg_card_size, defs_dict):
-    """Run processes for convert svg to png."""
+def svg2png(svg_cards, svg_start_pos, svg_card_size, defs_string, keep_pool=False):
+    """Run processes for convert svg to png, defs from defs2string are parsed once per process."""
+    global __pool, __pool_defs
     svg_cards_string = [etree.tostring(card) for card in svg_cards.values()]
-    defs_string = [etree.tostring(obj) for obj in defs_dict.values()]
-    with multiprocessing.Pool() as pool:
-        return pool.starmap(__thread_svg2png, zip(svg_cards_string, repeat(svg_start_pos), repeat(svg_card_size), repeat(defs_string)))
+    if 1 == len(svg_cards_string):
+        if __defs_string is not defs_string:
+            with __defs_lock:
+                if __defs_string is not defs_string:
+                    __init_svg2png(defs_string)
+        return [__thread_svg2png(svg_cards_string[0], svg_start_pos, svg_card_size)]
+    if __pool is not None and __pool_defs is not defs_string:
+        close_pool()
+    pool = __pool
+    if pool is None:
+        pool = multiprocessing.Pool(initializer=__init_process, initargs=(defs_string,))
+    chunksize = max(1, len(svg_cards_string) // (4 * (os.cpu_count() or 1)))
+    try:
+        return list(pool.imap_unordered(__task_svg2png, zip(svg_cards_string, repeat(svg_start_pos), repeat(svg_card_size)), chunksize))
+    finally:
+        if keep_pool:
+            __pool = pool
+            __pool_defs = defs_string
+        elif pool is not __pool:
+            pool.terminate()
+
+
+def close_pool():
+    """Close long-lived pool for convert svg to png, pool is cleared before terminate for other threads."""
+    global __pool
+    pool, __pool = __pool, None
+    if pool is not None:
+        pool.terminate()
 
 
 def png2tex(data, card_x, card_y):
@@ -78,10 +153,3 @@ def png2tex(data, card_x, card_y):
     with multiprocessing.pool.ThreadPool() as pool:
         results = pool.starmap(__thread_png2tex, zip(data, repeat(card_x), repeat(card_y)))
         return {name: tex for name, tex in results}
-
-
-def sounds(data, volume):
-    """Thread for load wav sound in pygame."""
-    with multiprocessing.pool.ThreadPool() as pool:
-        results = pool.starmap(__thread_sound, zip(data, repeat(volume)))
-        return {name: wav for name, wav in results}
@@ -0,0 +1,107 @@
+"""
+Profiler of frames for solitaire.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+"""
+
+import collections
+import contextlib
+import time
+
+
+PHASES = ('events', 'actions', 'draw', 'flip', 'total')
+
+
+class Profiler:
+    """Profiler class with ring buffers of frame phases and keypress latency."""
+
+    def __init__(self, config):
+        """Initialize profiler class from settings, disabled profiler records nothing."""
+        self.enabled = config.getboolean('profile', 'enabled')
+        self.file_name = config.get('profile', 'file')
+        size = config.getint('profile', 'size')
+        self.frames = collections.deque(maxlen=size)
+        self.latencies = collections.deque(maxlen=size)
+        self.overlay = False
+        self.startup = []
+        self.__frame = None
+        self.__start = 0
+        self.__key = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Record time of startup phase in with block, startup is traced always."""
+        start = time.perf_counter()
+        yield
+        self.startup.append((name, start, time.perf_counter()))
+
+    def start(self):
+        """Start timing of new frame."""
+        if self.enabled:
+            self.__frame = dict.fromkeys(PHASES, 0.0)
+            self.__start = time.perf_counter()
+
+    def add(self, phase, start):
+        """Add time from start in phase of current frame."""
+        if self.enabled and self.__frame is not None:
+            self.__frame[phase] += time.perf_counter() - start
+
+    def stop(self):
+        """Finish timing of frame and put it in ring buffer, events are without actions."""
+        if self.enabled and self.__frame is not None:
+            self.__frame['events'] -= self.__frame['actions']
+            self.__frame['total'] = time.perf_counter() - self.__start
+            self.frames.append(self.__frame)
+            self.__frame = None
+
+    def key(self):
+        """Remember time of keypress for latency of speech output."""
+        if self.enabled:
+            self.__key = time.perf_counter()
+
+    def output(self, output_time):
+        """Record latency from keypress when speech output was after it."""
+        if self.enabled and self.__key is not None and output_time >= self.__key:
+            self.latencies.append(output_time - self.__key)
+            self.__key = None
+
+    def summary(self, speech_stats=None):
+        """Return lines with mean and max times in milliseconds."""
+        lines = []
+        for phase in PHASES:
+            lines.append(self.__line(phase, [frame[phase] for frame in self.frames]))
+        lines.append(self.__line('latency', self.latencies))
+        if speech_stats is not None:
+            for name, latency in speech_stats[1].items():
+                count = max(latency['count'], 1)
+                lines.append('speech {} wait {:.2f}/{:.2f} output {:.2f}/{:.2f} dropped {}'.format(name,
+                             latency['wait'] / count * 1000, latency['wait_max'] * 1000,
+                             latency['output'] / count * 1000, latency['output_max'] * 1000, latency['dropped']))
+        return lines
+
+    def __line(self, name, values):
+        """Return line with mean and max of values in milliseconds."""
+        values = list(values)
+        if not values:
+            return '{} -'.format(name)
+        return '{} {:.2f}/{:.2f}'.format(name, sum(values) / len(values) * 1000, max(values) * 1000)
+
+    def dump(self, speech_stats=None, spans=()):
+        """Write summary, startup trace with spans of background work, frames and latencies in text file."""
+        with open(self.file_name, 'w') as profile_file:
+            profile_file.write('startup: begin/duration ms\n')
+            origin = self.startup[0][1] if self.startup else 0
+            for name, start, finish in self.startup + [(name, *span) for name, span in spans if span is not None]:
+                profile_file.write('{}\t{:.3f}\t{:.3f}\n'.format(name, (start - origin) * 1000, (finish - start) * 1000))
+            profile_file.write('\n')
+            profile_file.write('mean/max ms\n')
+            profile_file.write('\n'.join(self.summary(speech_stats)) + '\n\n')
+            profile_file.write('\t'.join(PHASES) + '\n')
+            for frame in self.frames:
+                profile_file.write('\t'.join('{:.3f}'.format(frame[phase] * 1000) for phase in PHASES) + '\n')
+            profile_file.write('\nlatency\n')
+            for latency in self.latencies:
+                profile_file.write('{:.3f}\n'.format(latency * 1000))
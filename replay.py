@@ -0,0 +1,121 @@
+"""
+Binary log of player actions and headless replay.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python replay.py moves.log
+
+"""
+
+import os
+import struct
+import sys
+import time
+
+from configparser import ConfigParser
+
+from board import Board
+
+from player import Actions
+from player import Player
+
+from resources import Resources
+
+
+LOG_NAME = 'moves.log'
+LOG_MAGIC = b'SOLMOVES'
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct('<8sH')
+LOG_GAME = struct.Struct('<QHB')
+GAME_TAG = 0
+
+
+class MoveLog:
+    """Append only log: game records with seed and one byte for every action."""
+
+    def __init__(self, name=LOG_NAME, max_size=0):
+        """Initialize log class, log over max size in bytes is renamed to .old and new file gets header."""
+        if max_size > 0 and os.path.isfile(name) and os.path.getsize(name) >= max_size:
+            os.replace(name, name + '.old')
+        self.__file = open(name, 'ab')
+        if 0 == self.__file.tell():
+            self.__file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+            self.__file.flush()
+
+    def game(self, seed, deck_count, delivery):
+        """Write record of new game."""
+        self.__file.write(bytes((GAME_TAG,)) + LOG_GAME.pack(seed, deck_count, delivery))
+        self.__file.flush()
+
+    def action(self, action):
+        """Write record of action and flush it, so actions before crash are in log."""
+        self.__file.write(bytes((action.value,)))
+        self.__file.flush()
+
+    def close(self):
+        """Close log file."""
+        self.__file.close()
+
+
+def read_log(name=LOG_NAME):
+    """Return games from log as list of (seed, deck_count, delivery, actions)."""
+    with open(name, 'rb') as log_file:
+        data = log_file.read()
+    magic, version = LOG_HEADER.unpack_from(data)
+    if LOG_MAGIC != magic or LOG_VERSION != version:
+        raise ValueError('unknown log format')
+    games = []
+    position = LOG_HEADER.size
+    while position < len(data):
+        if GAME_TAG == data[position]:
+            seed, deck_count, delivery = LOG_GAME.unpack_from(data, position + 1)
+            games.append((seed, deck_count, delivery, []))
+            position += 1 + LOG_GAME.size
+        else:
+            if games:
+                games[-1][3].append(Actions(data[position]))
+            position += 1
+    return games
+
+
+class Silent:
+    """Sounds and speech without output for headless replay."""
+
+    def play(self, name):
+        """Do not play sound."""
+        pass
+
+    def speak(self, phrase):
+        """Do not speak phrase."""
+        pass
+
+
+def replay(games, config, resources):
+    """Apply actions of games on headless board, return list of (seed, actions, win, time)."""
+    silent = Silent()
+    language = config.get('total', 'language')
+    board = Board(config, None, silent, True)
+    player = Player(board, silent, resources.phrases(language), resources.card_names(language))
+    results = []
+    for seed, deck_count, delivery, actions in games:
+        start = time.perf_counter()
+        config.set('board', 'deck', 'half' if 36 == deck_count else 'full')
+        config.set('board', 'delivery', str(delivery))
+        board.create_deck(seed)
+        board.clear_zones()
+        board.distribution()
+        player.reset()
+        for action in actions:
+            player.actions(action)
+        results.append((seed, len(actions), board.engine.won(), time.perf_counter() - start))
+    return results
+
+
+if __name__ == '__main__':
+    config = ConfigParser()
+    config.read('settings.ini')
+    for result in replay(read_log(sys.argv[1] if len(sys.argv) > 1 else config.get('log', 'file')), config, Resources()):
+        print('{}\t{}\t{}\t{:.4f}'.format(*result))
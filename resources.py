@@ -0,0 +1,55 @@
+"""
+Resources with phrases and help loaded once.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+"""
+
+import pickle
+
+from constants import Cards
+
+import engine
+
+
+class Resources:
+    """Cache of phrases, help and spoken card names by languages."""
+
+    def __init__(self):
+        """Initialize resources class, files are loaded on first access."""
+        self.__languages = None
+        self.__help = None
+        self.__help_lines = {}
+        self.__card_names = {}
+
+    def phrases(self, language):
+        """Return phrases table of language."""
+        if self.__languages is None:
+            with open('languages.dat', 'rb') as lang_file:
+                self.__languages = pickle.load(lang_file)
+        return self.__languages[language]
+
+    def help(self, language):
+        """Return help lines of language without empty lines."""
+        if language not in self.__help_lines:
+            if self.__help is None:
+                with open('help.dat', 'rb') as help_file:
+                    self.__help = pickle.load(help_file)
+            self.__help_lines[language] = [line for line in self.__help[language] if '\n' != line]
+        return self.__help_lines[language]
+
+    def card_names(self, language):
+        """Return spoken names of cards by deck count and card code."""
+        if language not in self.__card_names:
+            phrases = self.phrases(language)
+            names = {}
+            for deck_count in (36, 52):
+                names[deck_count] = {}
+                for code in engine.new_deck(deck_count):
+                    rate = 1 if 36 == deck_count and 5 == engine.rate(code) else engine.rate(code)
+                    rate_name = phrases[Cards.rates[rate]] if 1 == rate or 10 < rate else str(rate)
+                    names[deck_count][code] = ' '.join((rate_name, phrases[Cards.suits[engine.suit(code)]]))
+            self.__card_names[language] = names
+        return self.__card_names[language]
@@ -0,0 +1,403 @@
+"""
+Solver for solitaire deals.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+"""
+
+import time
+
+from constants import Cards
+
+import engine
+
+
+SEPARATOR = b'\xff'
+DROP_MASK = Cards.SUIT | Cards.RATE
+TARGETS = [None if 13 == engine.rate(card) else (engine.rate(card) + 1) | (~card & Cards.RED) for card in range(Cards.FACE_UP << 1)]
+
+
+class Solver:
+    """Depth first solver with transposition table and budget."""
+
+    def __init__(self, nodes=200000, seconds=1.0, table_size=200000):
+        """Initialize solver class."""
+        self.max_nodes = nodes
+        self.max_seconds = seconds
+        self.table_size = table_size
+        self.nodes = 0
+        self.path = []
+        self.__talons = {}
+        self.__sequences = {}
+
+    def solve(self, game):
+        """Return True if game is winnable, False if all moves are searched without win and None if budget is over."""
+        self.nodes = 0
+        self.path = []
+        self.__table = {}
+        self.__old_table = {}
+        self.__talons = {}
+        self.__sequences = {}
+        self.__piles = {}
+        start = time.perf_counter()
+        root = game.copy()
+        drops = self.__drops(root)
+        finish = self.__finish(root)
+        if finish is not None:
+            self.path = self.__unpack(game, [drops, finish])
+            return True
+        if self.__blocked(root):
+            return False
+        root_key = self.key(root)
+        self.__remember(root_key)
+        stack = [(root, self.moves(root), root_key)]
+        path = [drops]
+        on_path = {root_key}
+        while stack:
+            state, moves, state_key = stack[-1]
+            if not moves:
+                stack.pop()
+                on_path.discard(state_key)
+                path.pop()
+                continue
+            move, use = moves.pop()
+            child = state.copy()
+            self.apply(child, move)
+            steps = [move] if use is not None else [move] + self.__drops(child)
+            self.nodes += 1
+            finish = self.__finish(child)
+            if finish is not None:
+                self.path = self.__unpack(game, path + [steps, finish])
+                return True
+            if self.nodes >= self.max_nodes or (0 == self.nodes % 1024 and time.perf_counter() - start >= self.max_seconds):
+                return None
+            child_key = self.key(child)
+            if self.__seen(child_key) or self.__blocked(child):
+                continue
+            if use is not None:
+                child_key += SEPARATOR + bytes(child.columns[use[0]]) + SEPARATOR + bytes((use[1],))
+            if child_key in on_path or self.__seen(child_key):
+                continue
+            self.__remember(child_key)
+            path.append(steps)
+            on_path.add(child_key)
+            stack.append((child, self.moves(child, use), child_key))
+        return False
+
+    def hint(self, game):
+        """Return first engine move of found solution or None."""
+        if self.solve(game) and self.path:
+            return self.path[0]
+        return None
+
+    def key(self, game):
+        """Return canonical state of game as bytes, order of houses and columns is not important."""
+        if 1 == game.delivery:
+            talon = [bytes(card & ~Cards.FACE_UP for card in game.recall + game.incoming + game.deck[::-1])]
+        else:
+            talon = [bytes(game.deck), bytes(game.recall), bytes(game.incoming)]
+        return SEPARATOR.join(talon + sorted(bytes(pile) for pile in game.house) + sorted(bytes(pile) for pile in game.columns))
+
+    def apply(self, game, move):
+        """Apply solver move: count of deals and engine move, moves of solver are legal and not checked."""
+        deals, (kind, zone, row, index, dst_zone, dst_row) = move
+        for _ in range(deals):
+            self.__deal(game)
+        pile = game.zones[zone][row]
+        if engine.MOVE_DROP == kind:
+            game.house[game.drop_row(pile[-1])].append(pile.pop())
+        else:
+            game.zones[dst_zone][dst_row].extend(pile[index:])
+            del pile[index:]
+        if pile:
+            pile[-1] |= Cards.FACE_UP
+
+    def moves(self, game, use=None):
+        """Build ordered list of (solver move, use) pairs for pop: best move is last.
+
+        Solver move is count of deals and engine move. Move without direct profit (column move which does
+        not open card or card for drop, house to column and talon to column when all cards of talon are
+        reachable by deals) is useful only for next move with cards of its column, so use of it is pair
+        of row and flag: next move takes cards from top of column row if flag is set or puts cards on it.
+        Moves of game with use are only moves of this column and house to column moves, house gives new top
+        card too, else use is None and all moves are built. Card from house is built only if card from
+        columns or talon can be put on it or on lower card from houses.
+        """
+        houses = self.__houses(game)
+        columns = self.__columns(game)
+        scored = []
+        if use is None:
+            for row, pile in enumerate(game.columns):
+                if not pile:
+                    continue
+                if pile[-1] & DROP_MASK in houses:
+                    scored.append((6, 0, (0, (engine.MOVE_DROP, engine.COLUMNS, row, -1, engine.HOUSE, -1)), None))
+                for index in self.__sequence(pile):
+                    self.__put(game, houses, columns, row, index, scored)
+            for deals, zone, card in self.__talon(game):
+                if card & DROP_MASK in houses:
+                    scored.append((6, -deals, (deals, (engine.MOVE_DROP, zone, 0, -1, engine.HOUSE, -1)), None))
+                for dst_row in self.__rows(columns, card):
+                    self.__put_talon(game, deals, zone, dst_row, scored)
+        else:
+            row, take = use
+            pile = game.columns[row]
+            if take and pile[-1] & DROP_MASK in houses:
+                scored.append((6, 0, (0, (engine.MOVE_DROP, engine.COLUMNS, row, -1, engine.HOUSE, -1)), None))
+            if take:
+                for index in self.__sequence(pile):
+                    self.__put(game, houses, columns, row, index, scored)
+            target = pile[-1] & (Cards.RATE | Cards.RED) if pile else None
+            for src_row, src_pile in enumerate(game.columns):
+                if src_row != row and src_pile:
+                    for index in self.__sequence(src_pile):
+                        if TARGETS[src_pile[index]] == target:
+                            self.__put(game, houses, {target: [row]}, src_row, index, scored)
+            for deals, zone, card in self.__talon(game):
+                if TARGETS[card] == target:
+                    self.__put_talon(game, deals, zone, row, scored)
+            if not pile or pile[-1] & DROP_MASK not in houses:
+                # card from house opens next cards of houses, else houses put only on column row
+                columns = {target: [row]}
+        low = None
+        for src_row, src_pile in enumerate(game.house):
+            rows = self.__rows(columns, src_pile[-1]) if src_pile else []
+            if rows and low is None:
+                low = self.__low(game, houses)
+            if rows and engine.rate(src_pile[-1]) >= low:
+                for dst_row in rows:
+                    scored.append((0, 0, (0, (engine.MOVE_PUT, engine.HOUSE, src_row, -1, engine.COLUMNS, dst_row)), (dst_row, True)))
+        scored.sort(key=lambda item: item[:2])
+        return [(move, move_use) for _, _, move, move_use in scored]
+
+    def __put(self, game, houses, columns, row, index, scored):
+        """Add moves of cards from index of column row in other columns in scored."""
+        pile = game.columns[row]
+        if index == -len(pile):
+            score, use = (0, 0), (row, False)
+        elif not pile[index - 1] & Cards.FACE_UP:
+            score, use = (5, len(pile) + index), None
+        else:
+            score, use = (0, 0), (row, True)
+        for dst_row in self.__rows(columns, pile[index]):
+            if dst_row != row and (index != -len(pile) or game.columns[dst_row]):
+                scored.append(score + ((0, (engine.MOVE_PUT, engine.COLUMNS, row, index, engine.COLUMNS, dst_row)), use))
+
+    def __put_talon(self, game, deals, zone, dst_row, scored):
+        """Add move of card from talon in column row in scored."""
+        move = (deals, (engine.MOVE_PUT, zone, 0, -1, engine.COLUMNS, dst_row))
+        if 1 == game.delivery:
+            scored.append((0, -deals, move, (dst_row, False)))
+        else:
+            scored.append((2, -deals, move, None))
+
+    def __houses(self, game):
+        """Return cards for drop in houses without face up flag."""
+        houses = {}
+        for pile in game.house:
+            if pile:
+                houses[engine.suit(pile[-1])] = engine.rate(pile[-1])
+        return {suit << 4 | (houses.get(suit, game.ace - 1) + 1) for suit in range(len(Cards.suits)) if 13 != houses.get(suit)}
+
+    def __low(self, game, houses):
+        """Return lowest rate of card in houses for put card from columns or talon, cards from houses are useful only with it."""
+        tops = [13] * len(Cards.suits)
+        for house in houses:
+            tops[engine.suit(house)] = engine.rate(house) - 1
+        rates = {0: 14, Cards.RED: 14}
+        cards = [pile[index] for pile in game.columns if pile for index in self.__sequence(pile)[:2]]
+        cards.extend(card for _, _, card in self.__talon(game))
+        for card in cards:
+            rates[card & Cards.RED] = min(rates[card & Cards.RED], engine.rate(card) + 1)
+        low = 14
+        for suit, top in enumerate(tops):
+            rate = rates[~suit << 4 & Cards.RED]
+            if top >= rate:
+                low = min(low, rate)
+        return low
+
+    def __columns(self, game):
+        """Return rows of columns by masked top card, empty rows are under None."""
+        columns = {}
+        for row, pile in enumerate(game.columns):
+            columns.setdefault(pile[-1] & (Cards.RATE | Cards.RED) if pile else None, []).append(row)
+        return columns
+
+    def __rows(self, columns, card):
+        """Return rows of columns for put card, only first of empty rows, they are same."""
+        target = TARGETS[card]
+        rows = columns.get(target, [])
+        return rows[:1] if target is None else rows
+
+    def __sequence(self, pile):
+        """Return indexes of open cards in sequence from top of pile."""
+        pile_key = bytes(pile)
+        indexes = self.__sequences.get(pile_key)
+        if indexes is not None:
+            return indexes
+        indexes = [-1]
+        for index in range(-2, -len(pile) - 1, -1):
+            card = pile[index]
+            if not card & Cards.FACE_UP or TARGETS[pile[index + 1]] != card & (Cards.RATE | Cards.RED):
+                break
+            indexes.append(index)
+        if len(self.__sequences) >= self.table_size:
+            self.__sequences.clear()
+        self.__sequences[pile_key] = indexes
+        return indexes
+
+    def __blocked(self, game):
+        """Check some card in columns never leaves its column, then game is lost."""
+        for pile in game.columns:
+            pile_key = bytes(pile)
+            blocked = self.__piles.get(pile_key)
+            if blocked is None:
+                blocked = self.__pile_blocked(pile)
+                if len(self.__piles) >= self.table_size:
+                    self.__piles.clear()
+                self.__piles[pile_key] = blocked
+            if blocked:
+                return True
+        return False
+
+    def __pile_blocked(self, pile):
+        """Check card of pile is over lower card of its suit and over both cards for put it, not on one of them."""
+        for index, card in enumerate(pile):
+            if 13 == engine.rate(card) or (index and pile[index - 1] & Cards.FACE_UP and TARGETS[card] == pile[index - 1] & (Cards.RATE | Cards.RED)):
+                continue
+            under = pile[:index]
+            if any(engine.suit(lower) == engine.suit(card) and engine.rate(lower) < engine.rate(card) for lower in under):
+                if 2 == sum(TARGETS[card] == lower & (Cards.RATE | Cards.RED) for lower in under):
+                    return True
+        return False
+
+    def __drops(self, game):
+        """Apply drops in houses which are never wrong, return their solver moves.
+
+        Card from top of column is never wrong in house if it can be put back on same card from house,
+        else card from column or talon is dropped by rule of safe drop.
+        """
+        drops = []
+        while True:
+            houses = self.__houses(game)
+            for row, pile in enumerate(game.columns):
+                if pile and pile[-1] & DROP_MASK in houses and (self.__back(pile) or self.__safe(game, houses, pile[-1])):
+                    move = (0, (engine.MOVE_DROP, engine.COLUMNS, row, -1, engine.HOUSE, -1))
+                    break
+            else:
+                for deals, zone, card in self.__talon(game):
+                    if card & DROP_MASK in houses and (1 == game.delivery or 0 == deals) and self.__safe(game, houses, card):
+                        move = (deals, (engine.MOVE_DROP, zone, 0, -1, engine.HOUSE, -1))
+                        break
+                else:
+                    return drops
+            self.apply(game, move)
+            drops.append(move)
+
+    def __back(self, pile):
+        """Check top card of column can be put back on same place from house."""
+        if 1 == len(pile):
+            return TARGETS[pile[-1]] is None
+        return bool(pile[-2] & Cards.FACE_UP) and TARGETS[pile[-1]] == pile[-2] & (Cards.RATE | Cards.RED)
+
+    def __safe(self, game, houses, card):
+        """Check drop card in house is never wrong: cards of other color one rate lower are in houses or can be dropped without need of them."""
+        rate = engine.rate(card)
+        if rate <= game.ace + 1:
+            return True
+        tops = [13] * len(Cards.suits)
+        for house in houses:
+            tops[engine.suit(house)] = engine.rate(house) - 1
+        other = min(top for suit, top in enumerate(tops) if (suit << 4 ^ card) & Cards.RED)
+        same = min(top for suit, top in enumerate(tops) if (suit << 4 ^ card) & Cards.SUIT == 1 << 4)
+        return other >= rate - 1 or (other >= rate - 2 and same >= rate - 3)
+
+    def __finish(self, game):
+        """Return solver moves with drops of all cards in houses when all cards in columns are open, None if drops do not win."""
+        if not all(pile[0] & Cards.FACE_UP for pile in game.columns if pile):
+            return None
+        state = game.copy()
+        moves = []
+        while not state.won():
+            for row, pile in enumerate(state.columns):
+                if pile and -1 != state.drop_row(pile[-1]):
+                    move = (0, (engine.MOVE_DROP, engine.COLUMNS, row, -1, engine.HOUSE, -1))
+                    break
+            else:
+                for deals, zone, card in self.__talon(state):
+                    if -1 != state.drop_row(card):
+                        move = (deals, (engine.MOVE_DROP, zone, 0, -1, engine.HOUSE, -1))
+                        break
+                else:
+                    return None
+            self.apply(state, move)
+            moves.append(move)
+        return moves
+
+    def __talon(self, game):
+        """Return cards reachable in recall and incoming by deals as (deals, zone, card), each card once."""
+        talon_key = (bytes(game.deck), bytes(game.recall), bytes(game.incoming))
+        cards = self.__talons.get(talon_key)
+        if cards is not None:
+            return cards
+        talon = engine.Engine(game.delivery, game.deck_count)
+        talon.recall.extend(game.recall)
+        talon.deck.extend(game.deck)
+        talon.incoming.extend(game.incoming)
+        cards = []
+        found = set()
+        seen = set()
+        deals = 0
+        while True:
+            state = (bytes(talon.deck), bytes(talon.recall), bytes(talon.incoming))
+            if state in seen:
+                break
+            seen.add(state)
+            for zone in (engine.INCOMING, engine.RECALL):
+                pile = talon.pile(zone)
+                if pile and (engine.INCOMING == zone or talon.deck) and pile[-1] & ~Cards.FACE_UP not in found:
+                    found.add(pile[-1] & ~Cards.FACE_UP)
+                    cards.append((deals, zone, pile[-1] & ~Cards.FACE_UP))
+            if not self.__deal(talon):
+                break
+            deals += 1
+        if len(self.__talons) >= self.table_size // 8:
+            self.__talons.clear()
+        self.__talons[talon_key] = cards
+        return cards
+
+    def __deal(self, game):
+        """Deal cards from deck or recall cards in deck, return True if talon changed."""
+        if game.deck:
+            return bool(game.drop_deck())
+        return bool(game.drop_recall())
+
+    def __unpack(self, game, path):
+        """Return engine moves of solver path with deals."""
+        state = game.copy()
+        moves = []
+        for deals, move in (step for steps in path for step in steps):
+            for _ in range(deals):
+                if state.deck:
+                    moves.append((engine.MOVE_DEAL, engine.DECK, 0, -1, engine.INCOMING, 0))
+                else:
+                    moves.append((engine.MOVE_RECALL, engine.RECALL, 0, -1, engine.DECK, 0))
+                self.__deal(state)
+            if engine.MOVE_DROP == move[0]:
+                move = move[:5] + (state.drop_row(state.pile(move[1], move[2])[-1]),)
+            moves.append(move)
+            state.apply(move)
+        return moves
+
+    def __seen(self, state_key):
+        """Check state in transposition table."""
+        return state_key in self.__table or state_key in self.__old_table
+
+    def __remember(self, state_key):
+        """Add state in transposition table, oldest half is dropped when table is full."""
+        if len(self.__table) >= self.table_size // 2:
+            self.__old_table = self.__table
+            self.__table = {}
+        self.__table[state_key] = True
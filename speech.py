@@ -7,32 +7,72 @@ Created on 22.11.2018
 
 """
 
-import sys
+import threading
 import time
 
-import Tolk
+try:
+    import Tolk
+except (ImportError, OSError):
+    Tolk = None
 
-import win32com.client
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    win32com = None
 
 
-class Speech:
-    """The speak class for speak voice."""
+PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH = range(3)
 
-    def __init__(self, config):
-        """Initialize speech class."""
-        self.config = config
 
+class BackendSapi:
+    """Speak out in sapi voice."""
+
+    NAME = 'sapi'
+
+    def __init__(self, config):
+        """Initialize sapi voice in current thread."""
+        pythoncom.CoInitialize()
         self.SVSFlagsAsync = 1
+        self.SVSFPurgeBeforeSpeak = 2
         self.speaker = win32com.client.Dispatch("Sapi.SpVoice")
         self.voices = self.speaker.GetVoices()
         self.voices_ids = [voice.Id for voice in self.voices]
         self.voices_names = [voice.GetDescription() for voice in self.voices]
+        self.set_voice(config.getint('speech', 'voice'))
+        self.speaker.Rate = config.getint('speech', 'rate')
+        self.speaker.Volume = config.getint('speech', 'volume')
+
+    def set_voice(self, index):
+        """Set voice for speak."""
+        try:
+            self.speaker.Voice = self.voices[index]
+        except:
+            print('error: do not set voice')
+
+    def output(self, phrase, interrupt=False):
+        """Speak phrase in sapi voice."""
+        flags = self.SVSFlagsAsync
+        if interrupt:
+            flags |= self.SVSFPurgeBeforeSpeak
+        self.speaker.Speak(phrase, flags)
+
+    def silence(self):
+        """Stop speaking and purge phrases of sapi voice."""
+        self.speaker.Speak('', self.SVSFlagsAsync | self.SVSFPurgeBeforeSpeak)
 
-        self.sapi = self.config.getboolean('speech', 'sapi')
-        self.set_voice(self.config.getint('speech', 'voice'))
-        self.speaker.Rate = self.config.getint('speech', 'rate')
-        self.speaker.Volume = self.config.getint('speech', 'volume')
+    def close(self):
+        """Close sapi voice."""
+        pythoncom.CoUninitialize()
 
+
+class BackendTolk:
+    """Speak out with screen reader by tolk."""
+
+    NAME = 'tolk'
+
+    def __init__(self, config):
+        """Load tolk and detect screen reader."""
         self.error = False
         Tolk.load()
         self.name = Tolk.detect_screen_reader()
@@ -43,32 +83,192 @@ class Speech:
             self.error = True
             print('Screen reader nottsupport speak text')
 
-        self.set_speak_out()
+    def output(self, phrase, interrupt=False):
+        """Speak phrase with tolk."""
+        Tolk.output(phrase, interrupt)
 
-    def finish(self):
-        """Unload Tolk."""
+    def silence(self):
+        """Stop speaking of screen reader."""
+        Tolk.silence()
+
+    def close(self):
+        """Unload tolk."""
         Tolk.unload()
 
-    def set_voice(self, index):
-        """Set voice for speak."""
+
+class BackendNull:
+    """Speak out without output."""
+
+    NAME = 'null'
+
+    def __init__(self, config):
+        """Initialize null backend."""
+        pass
+
+    def output(self, phrase, interrupt=False):
+        """Do not speak phrase."""
+        pass
+
+    def silence(self):
+        """Nothing to stop."""
+        pass
+
+    def close(self):
+        """Nothing to close."""
+        pass
+
+
+class BackendRecording(BackendNull):
+    """Speak out in list of phrases for tests."""
+
+    NAME = 'recording'
+
+    def __init__(self, config):
+        """Initialize recording backend."""
+        self.phrases = []
+
+    def output(self, phrase, interrupt=False):
+        """Record phrase with interrupt flag and time."""
+        self.phrases.append((time.perf_counter(), phrase, interrupt))
+
+
+BACKENDS = {backend.NAME: backend for backend in (BackendSapi, BackendTolk, BackendNull, BackendRecording)}
+
+
+def create_backend(config):
+    """Create backend from speech settings, auto is tolk with screen reader, else sapi or null."""
+    name = config.get('speech', 'backend')
+    if 'auto' != name:
+        return BACKENDS[name](config)
+    if Tolk is not None:
+        backend = BackendTolk(config)
+        if not backend.error or win32com is None or not config.getboolean('speech', 'sapi'):
+            return backend
+        backend.close()
+    if win32com is not None and config.getboolean('speech', 'sapi'):
+        return BackendSapi(config)
+    return BackendNull(config)
+
+
+class Speech:
+    """The speak class for speak voice in background worker."""
+
+    def __init__(self, config):
+        """Initialize speech class and start worker, backend is created in worker."""
+        self.config = config
+        self.queue_size = self.config.getint('speech', 'queue')
+        self.backend = None
+        self.latency = {}
+        self.output_time = 0.0
+        self.init_span = None
+
+        self.__queue = []
+        self.__interrupt = False
+        self.__silence = False
+        self.__running = True
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def speak(self, phrase, priority=PRIORITY_NORMAL):
+        """Put phrase in queue, when queue is full oldest phrase with lowest priority is dropped."""
+        with self.__condition:
+            if len(self.__queue) >= self.queue_size:
+                index = min(range(len(self.__queue)), key=lambda index: self.__queue[index][0])
+                if self.__queue[index][0] > priority:
+                    self.__count('dropped')
+                    return
+                del self.__queue[index]
+                self.__count('dropped')
+            self.__queue.append((priority, phrase, time.perf_counter()))
+            self.__condition.notify()
+
+    def interrupt(self):
+        """Drop stale phrases without high priority, next phrase interrupts speaking."""
+        with self.__condition:
+            queue = [item for item in self.__queue if PRIORITY_HIGH == item[0]]
+            self.__count('dropped', len(self.__queue) - len(queue))
+            self.__queue = queue
+            self.__interrupt = True
+
+    def silence(self):
+        """Stop phrase which is speaking now, queue is not changed."""
+        with self.__condition:
+            self.__silence = True
+            self.__condition.notify()
+
+    def finish(self):
+        """Speak rest of phrases, stop worker and close backend."""
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify()
+        self.__thread.join(5)
+
+    def __worker(self):
+        """Speak phrases from queue, highest priority first."""
+        start = time.perf_counter()
         try:
-            self.speaker.Voice = self.voices[index]
-        except:
-            print('error: do not set voice')
+            backend = create_backend(self.config)
+        except Exception as error:
+            print('error: speech backend is not created, speech is off: {!r}'.format(error))
+            backend = BackendNull(self.config)
+        with self.__condition:
+            self.backend = backend
+            self.init_span = (start, time.perf_counter())
+        while True:
+            with self.__condition:
+                while self.__running and not self.__queue and not self.__silence:
+                    self.__condition.wait()
+                silence, self.__silence = self.__silence, False
+                if not silence and not self.__queue:
+                    break
+                if not silence:
+                    index = max(range(len(self.__queue)), key=lambda index: (self.__queue[index][0], -index))
+                    _, phrase, queued = self.__queue.pop(index)
+                    interrupt, self.__interrupt = self.__interrupt, False
+            if silence:
+                self.__call('silence')
+                continue
+            backend = self.backend
+            start = time.perf_counter()
+            self.output_time = start
+            self.__call('output', phrase, interrupt)
+            finish = time.perf_counter()
+            with self.__condition:
+                counters = self.__counters(backend)
+                counters['count'] += 1
+                self.__time(counters, 'wait', start - queued)
+                self.__time(counters, 'output', finish - start)
+        self.backend.close()
 
-    def set_speak_out(self):
-        """Set speak out: tolk or sapi."""
-        if self.error and self.sapi:
-            self.speak = self.speak_sapi
-        else:
-            self.speak = self.speak_tolk
+    def __call(self, method, *args):
+        """Call method of backend, failed backend is replaced by null backend."""
+        try:
+            getattr(self.backend, method)(*args)
+        except Exception as error:
+            print('error: speech backend failed, speech is off: {!r}'.format(error))
+            with self.__condition:
+                self.backend = BackendNull(self.config)
 
-    def speak_tolk(self, phrase):
-        """Speak phrase with tolk."""
-        Tolk.output(phrase)
+    def __counters(self, backend):
+        """Return latency counters of backend, phrases before backend is created are counted under None."""
+        name = None if backend is None else backend.NAME
+        counters = self.latency.get(name)
+        if counters is None:
+            counters = {'count': 0, 'dropped': 0, 'wait': 0.0, 'wait_max': 0.0, 'output': 0.0, 'output_max': 0.0}
+            self.latency[name] = counters
+        return counters
 
-    def speak_sapi(self, phrase):
-        """Speak phrase in sapi voice."""
-        self.speaker.skip("Sentence", sys.maxsize)
-        self.speaker.Speak(phrase, self.SVSFlagsAsync)
-        time.sleep(0.1)
+    def __count(self, name, value=1):
+        """Add value in counter of current backend."""
+        self.__counters(self.backend)[name] += value
+
+    def __time(self, counters, name, value):
+        """Add time in total and max counters of backend."""
+        counters[name] += value
+        counters[name + '_max'] = max(counters[name + '_max'], value)
+
+    def stats(self):
+        """Return name of current backend and copy of latency counters by names of backends."""
+        with self.__condition:
+            return (None if self.backend is None else self.backend.NAME, {name: dict(counters) for name, counters in self.latency.items()})
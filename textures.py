@@ -0,0 +1,146 @@
+"""
+Lazy cards textures for solitaire.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+"""
+
+import math
+import threading
+import time
+import xml.etree.ElementTree as etree
+
+import loader
+
+import processes
+
+import pygame
+
+
+def parse_svg(svg_name):
+    """Parse svg file with cards, return cards, start position, card size and defs."""
+    CARD_ROW = 5
+    CARD_COL = 13
+    etree.register_namespace("", "http://www.w3.org/2000/svg")
+    etree.register_namespace("xlink", "http://www.w3.org/1999/xlink")
+    root = etree.parse(svg_name).getroot()
+    viewBox = [float(param) for param in root.attrib['viewBox'].split(' ')]
+    start_pos = (viewBox[0], viewBox[1])
+    card_size = (viewBox[2] / CARD_COL, viewBox[3] / CARD_ROW)
+    prefix = "{http://www.w3.org/2000/svg}"
+    cards_iter = root.iterfind('./' + prefix + 'g/')
+    defs_iter = root.iterfind('./' + prefix + 'defs/')
+    defs = {obj.attrib['id']: obj for obj in defs_iter}
+    svg_cards = {card.attrib['id']: card for card in cards_iter}
+    joker_addons = [elem for elem in svg_cards['joker_black'].findall('./') if prefix + 'g' == elem.tag]
+    for addon in joker_addons:
+        svg_cards['joker_red'].append(addon)
+    return svg_cards, start_pos, card_size, defs
+
+
+class Textures:
+    """Cards textures rasterized on demand by texture name."""
+
+    def __init__(self, svg_name, card_x, card_y, cache_size):
+        """Initialize textures class and load cached atlas, svg is parsed only for missing textures."""
+        self.svg_name = svg_name
+        self.card_x = card_x
+        self.card_y = card_y
+        self.cache_size = cache_size
+        self.svg_cards = None
+        self.svg_start_pos = None
+        self.svg_card_size = None
+        self.defs = None
+        self.defs_string = None
+        self.raster_x = None
+        self.raster_y = None
+        self.parse_span = None
+        self.__parse_lock = threading.Lock()
+
+        self.key = loader.svg_key(svg_name)
+        self.atlas_name = loader.atlas_name(self.key, card_x, card_y)
+        self.__textures = loader.cached_textures(self.key, card_x, card_y, cache_size)
+        self.__rasters = {}
+        self.__pending = []
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__parse_thread = None
+        if not self.__textures:
+            self.__parse_thread = threading.Thread(target=self.load_svg, daemon=True)
+            self.__parse_thread.start()
+
+    def load_svg(self):
+        """Parse svg file with cards and sizes of rasters if it is not parsed yet."""
+        with self.__parse_lock:
+            if self.svg_cards is None:
+                start = time.perf_counter()
+                svg_cards, self.svg_start_pos, self.svg_card_size, self.defs = parse_svg(self.svg_name)
+                self.raster_x, self.raster_y = (int(math.ceil(size)) for size in self.svg_card_size)
+                self.defs_string = processes.defs2string(self.defs)
+                self.svg_cards = svg_cards
+                self.parse_span = (start, time.perf_counter())
+
+    def __getitem__(self, name):
+        """Return texture by name, rasterize it now if not ready."""
+        texture = self.__textures.get(name)
+        if texture is None:
+            self.__render([name])
+            texture = self.__textures[name]
+        return texture
+
+    def preload(self, names):
+        """Rasterize missing textures in background thread, in names order."""
+        with self.__lock:
+            self.__pending.extend(name for name in names if name not in self.__textures)
+            if self.__pending and self.__thread is None:
+                self.__thread = threading.Thread(target=self.__preload, daemon=True)
+                self.__thread.start()
+
+    def wait(self):
+        """Wait until background threads parsed svg and rasterized pending textures."""
+        if self.__parse_thread is not None:
+            self.__parse_thread.join()
+        thread = self.__thread
+        if thread is not None:
+            thread.join()
+
+    def __preload(self):
+        """Background thread for rasterize pending textures and save atlas, pool is closed when queue is empty."""
+        while True:
+            with self.__lock:
+                names = [name for name in dict.fromkeys(self.__pending) if name not in self.__textures]
+                self.__pending.clear()
+            if names:
+                self.__render(names)
+                continue
+            processes.close_pool()
+            self.__save()
+            with self.__lock:
+                if not self.__pending:
+                    self.__thread = None
+                    break
+
+    def __render(self, names):
+        """Rasterize textures from svg."""
+        self.load_svg()
+        svg_cards = {name: self.svg_cards[name] for name in names}
+        data = processes.svg2png(svg_cards, self.svg_start_pos, self.svg_card_size, self.defs_string, True)
+        rasters = processes.png2tex(data, self.raster_x, self.raster_y)
+        with self.__lock:
+            for name, raster in rasters.items():
+                self.__rasters[name] = raster
+                self.__textures[name] = pygame.transform.scale(raster, (self.card_x, self.card_y))
+
+    def __save(self):
+        """Write new rasterized textures in atlas cache."""
+        with self.__lock:
+            rasters, self.__rasters = self.__rasters, {}
+        if not rasters:
+            return
+        if (self.raster_x, self.raster_y) != (self.card_x, self.card_y):
+            raster_name = loader.atlas_name(self.key, self.raster_x, self.raster_y)
+            loader.cache_atlas(raster_name, self.key, rasters, self.raster_x, self.raster_y)
+        loader.cache_atlas(self.atlas_name, self.key, {name: self.__textures[name] for name in rasters}, self.card_x, self.card_y)
+        loader.evict_atlases(self.atlas_name, self.cache_size)
@@ -0,0 +1,90 @@
+"""
+Cross check of solver with exhaustive search of engine moves on small deals.
+
+Created on 18.10.2026
+
+@author: Ruslan Dolovanyuk
+
+example running:
+    python verify.py 0 100 3
+
+"""
+
+import multiprocessing
+import sys
+
+import engine
+
+from solver import Solver
+
+
+DECK_COUNT = 36
+EXHAUSTIVE_STATES = 5000000
+
+
+def key(game):
+    """Return state of game, order of houses and columns is not important."""
+    return (bytes(game.deck), bytes(game.recall), bytes(game.incoming),
+            tuple(sorted(bytes(pile) for pile in game.house)), tuple(sorted(bytes(pile) for pile in game.columns)))
+
+
+def exhaustive(game, max_states=EXHAUSTIVE_STATES):
+    """Search all states reachable by engine moves, return True if won, False if not and None if limit is over."""
+    seen = {key(game)}
+    stack = [game]
+    while stack:
+        state = stack.pop()
+        if state.won():
+            return True
+        for move in state.moves():
+            child = state.copy()
+            child.apply(move)
+            child_key = key(child)
+            if child_key not in seen:
+                if len(seen) >= max_states:
+                    return None
+                seen.add(child_key)
+                stack.append(child)
+    return False
+
+
+def replay(game, path):
+    """Check engine moves of solver path are legal and win game."""
+    state = game.copy()
+    return all(state.apply(move) for move in path) and state.won()
+
+
+def check_seed(args):
+    """Solve deal with seed by solver, check found path by engine or not found win by exhaustive search.
+
+    Return seed, solver verdict and verdict of check.
+    """
+    seed, delivery = args
+    game = engine.Engine(delivery, DECK_COUNT)
+    game.setup(engine.shuffled_deck(DECK_COUNT, seed))
+    solver = Solver(10000000, 600, 1000000)
+    solved = solver.solve(game)
+    if solved:
+        return (seed, solved, replay(game, solver.path))
+    return (seed, solved, exhaustive(game))
+
+
+def verify(seeds, delivery, processes=None):
+    """Check deals by seeds on all cores, print results, return count of deals where verdicts differ."""
+    errors = 0
+    with multiprocessing.Pool(processes) as pool:
+        for seed, solved, searched in pool.imap_unordered(check_seed, [(seed, delivery) for seed in seeds]):
+            status = 'ok'
+            if solved is None or searched is None:
+                status = 'unknown'
+            elif solved != searched:
+                status = 'error'
+                errors += 1
+            print('{}\t{}\t{}\t{}'.format(seed, solved, searched, status), flush=True)
+    return errors
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    delivery = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    sys.exit(1 if verify(range(int(sys.argv[1]), int(sys.argv[2])), delivery) else 0)
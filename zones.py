@@ -7,8 +7,6 @@ Created on 08.09.2018
 
 """
 
-import checker
-
 from constants import Colors
 
 import pygame
@@ -26,11 +24,76 @@ class ZoneBase:
         self.OFFSET_COLS = offset_cols
         self.color = Colors.YELLOW
         self.offset_zone = (self.LEFT, self.TOP)
+        self.changed = True
+        self.damaged = []
+        self.signatures = []
 
     def clear(self):
         """Clear variable for new game."""
         self.current_row = 0
         self.current_card = -1
+        self.changed = True
+
+    def update(self, rect=None):
+        """Mark zone for check changes and redraw rect on next frame."""
+        self.changed = True
+        if rect is not None:
+            self.damaged.append(rect)
+
+    def repaint(self):
+        """Mark all zone for redraw on next frame."""
+        self.update(self.zone.get_rect())
+
+    def get_rect(self):
+        """Return rect zone on board."""
+        return pygame.Rect(self.offset_zone, (self.WIDTH, self.HEIGHT))
+
+    def get_rows(self):
+        """Return all rows cards in zone."""
+        return [self.cards]
+
+    def get_row_rect(self, index):
+        """Return rect row in zone surface."""
+        return self.zone.get_rect()
+
+    def draw_row(self, index):
+        """Draw empty place and cards of row on zone surface."""
+        left, top = self.get_coord_zero(index)
+        pygame.draw.rect(self.zone, self.color, (left, top, self.card_size[0], self.card_size[1]), 1)
+        for card_index, card in enumerate(self.get_rows()[index]):
+            card.draw(self.zone, self.get_coord_card(index, card_index))
+
+    def draw(self, screen):
+        """Draw changed rows of zone on board and return dirty rects."""
+        if not self.changed:
+            return []
+        self.changed = False
+        rows = self.get_rows()
+        rects = [self.get_row_rect(index) for index in range(len(rows))]
+        signatures = [tuple((card, card.status, card.take) for card in row) for row in rows]
+        if len(self.signatures) != len(rows):
+            self.signatures = [None] * len(rows)
+        dirty = [index for index in range(len(rows)) if signatures[index] != self.signatures[index] or -1 != rects[index].collidelist(self.damaged)]
+        self.damaged.clear()
+        for index in dirty:
+            for neighbour, rect in enumerate(rects):
+                if neighbour not in dirty and rect.colliderect(rects[index]):
+                    dirty.append(neighbour)
+        if not dirty:
+            return []
+        if len(dirty) == len(rows):
+            self.zone.fill(Colors.DARKGREEN)
+            dirty_rects = [self.zone.get_rect()]
+        else:
+            dirty_rects = [rects[index] for index in dirty]
+            for rect in dirty_rects:
+                self.zone.fill(Colors.DARKGREEN, rect)
+        for index in sorted(dirty):
+            self.signatures[index] = signatures[index]
+            self.draw_row(index)
+        for rect in dirty_rects:
+            screen.blit(self.zone, rect.move(self.offset_zone), rect)
+        return [rect.move(self.offset_zone) for rect in dirty_rects]
 
 
 class ZoneRecall(ZoneBase):
@@ -46,16 +109,6 @@ class ZoneRecall(ZoneBase):
         self.zone = pygame.Surface((self.WIDTH, self.HEIGHT))
         self.cards = []
 
-    def draw(self, screen):
-        """Draw zone on board."""
-        left, top = self.get_coord_zero(0)
-        self.zone.fill(Colors.DARKGREEN)
-        pygame.draw.rect(self.zone, self.color, (left, top, self.card_size[0], self.card_size[1]), 1)
-        for index, card in enumerate(self.cards):
-            offset = self.get_coord_card(0, index)
-            card.draw(self.zone, offset)
-        screen.blit(self.zone, self.offset_zone)
-
     def get_coord_zero(self, index):
         """Return coord x and y empty row."""
         return (self.OFFSET_COLS, self.HEIGHT - self.OFFSET_COLS - self.card_size[1])
@@ -91,16 +144,6 @@ class ZoneDeck(ZoneBase):
         self.zone = pygame.Surface((self.WIDTH, self.HEIGHT))
         self.cards = []
 
-    def draw(self, screen):
-        """Draw zone on board."""
-        left, top = self.get_coord_zero(0)
-        self.zone.fill(Colors.DARKGREEN)
-        pygame.draw.rect(self.zone, self.color, (left, top, self.card_size[0], self.card_size[1]), 1)
-        for index, card in enumerate(self.cards):
-            offset = self.get_coord_card(0, index)
-            card.draw(self.zone, offset)
-        screen.blit(self.zone, self.offset_zone)
-
     def get_coord_zero(self, index):
         """Return coord x and y empty row."""
         return (self.OFFSET_COLS, self.HEIGHT - self.OFFSET_COLS - self.card_size[1])
@@ -137,13 +180,10 @@ class ZoneIncoming(ZoneBase):
         self.zone = pygame.Surface((self.WIDTH, self.HEIGHT))
         self.cards = []
 
-    def draw(self, screen):
-        """Draw zone on board."""
-        self.zone.fill(Colors.DARKGREEN)
-        for index, card in enumerate(self.cards):
-            offset = self.get_coord_card(0, index)
-            card.draw(self.zone, offset)
-        screen.blit(self.zone, self.offset_zone)
+    def draw_row(self, index):
+        """Draw cards of row on zone surface."""
+        for card_index, card in enumerate(self.cards):
+            card.draw(self.zone, self.get_coord_card(index, card_index))
 
     def get_coord_zero(self, index):
         """Return coord x and y empty row."""
@@ -183,16 +223,14 @@ class ZoneHouse(ZoneBase):
         for _ in range(4):
             self.rows.append([])
 
-    def draw(self, screen):
-        """Draw zone on board."""
-        self.zone.fill(Colors.DARKGREEN)
-        for row_index, row in enumerate(self.rows):
-            left, top = self.get_coord_zero(row_index)
-            pygame.draw.rect(self.zone, self.color, (left, top, self.card_size[0], self.card_size[1]), 1)
-            for index, card in enumerate(row):
-                offset = self.get_coord_card(row_index, index)
-                card.draw(self.zone, offset)
-        screen.blit(self.zone, self.offset_zone)
+    def get_rows(self):
+        """Return all rows cards in zone."""
+        return self.rows
+
+    def get_row_rect(self, index):
+        """Return rect row in zone surface."""
+        left, top = self.get_coord_zero(index)
+        return pygame.Rect(left, 0, self.card_size[0] + 12 * self.OFFSET, self.HEIGHT)
 
     def get_coord_zero(self, index):
         """Return coord x and y empty row."""
@@ -216,22 +254,6 @@ class ZoneHouse(ZoneBase):
         """Return card in current row for index."""
         return self.rows[self.current_row][index]
 
-    def take(self, cards, old_list):
-        """Check take card for put row."""
-        if len(cards) == 1:
-            if 'ace' == cards[0].rate:
-                if self.if_empty():
-                    self.rows[self.current_row].append(cards[0])
-                    old_list.remove(cards[0])
-                    return True
-            else:
-                if not self.if_empty():
-                    if cards[0].rate_index - 1 == self.get_card(-1).rate_index:
-                        self.rows[self.current_row].append(cards[0])
-                        old_list.remove(cards[0])
-                        return True
-        return False
-
 
 class ZoneColumns(ZoneBase):
     """Columns zone class for solitaires."""
@@ -249,39 +271,46 @@ class ZoneColumns(ZoneBase):
         self.rows = []
         for _ in range(7):
             self.rows.append([])
+        self.first_open = [0] * len(self.rows)
 
-    def draw(self, screen):
-        """Draw zone on board."""
-        self.zone.fill(Colors.DARKGREEN)
-        for row_index, row in enumerate(self.rows):
-            left, top = self.get_coord_zero(row_index)
-            pygame.draw.rect(self.zone, self.color, (left, top, self.card_size[0], self.card_size[1]), 1)
-            for index, card in enumerate(row):
-                offset = self.get_coord_card(row_index, index)
-                card.draw(self.zone, offset)
-        screen.blit(self.zone, self.offset_zone)
+    def get_rows(self):
+        """Return all rows cards in zone."""
+        return self.rows
+
+    def get_row_rect(self, index):
+        """Return rect row in zone surface."""
+        left, top = self.get_coord_zero(index)
+        return pygame.Rect(left, 0, self.card_size[0], self.HEIGHT)
 
     def get_coord_zero(self, index):
         """Return coord x and y empty row."""
         return (self.OFFSET_COLS + index * (self.card_size[0] + self.OFFSET_COLS), self.OFFSET_COLS)
 
+    def get_first_open(self, row_index):
+        """Return index first open card in row, moving index kept from last call."""
+        row = self.rows[row_index]
+        index = min(self.first_open[row_index], len(row))
+        while 0 < index and row[index - 1].status:
+            index -= 1
+        while index < len(row) and not row[index].status:
+            index += 1
+        self.first_open[row_index] = index
+        return index
+
     def get_coord_card(self, row_index, index):
         """Return coord x and y card in row stack."""
-        for index_first_open, card in enumerate(self.rows[row_index]):
-            if card.status:
-                break
-        offset_close_cards = index_first_open * self.OFFSET
-        if self.rows[row_index][index].status:
-            offset = (self.OFFSET_COLS + row_index * (self.card_size[0] + self.OFFSET_COLS), self.OFFSET_COLS + offset_close_cards + (index - index_first_open) * self.OFFSET_OPEN)
-        else:
-            offset = (self.OFFSET_COLS + row_index * (self.card_size[0] + self.OFFSET_COLS), self.OFFSET_COLS + index * self.OFFSET)
-        return offset
+        index_first_open = self.get_first_open(row_index)
+        left = self.OFFSET_COLS + row_index * (self.card_size[0] + self.OFFSET_COLS)
+        if index < index_first_open:
+            return (left, self.OFFSET_COLS + index * self.OFFSET)
+        return (left, self.OFFSET_COLS + index_first_open * self.OFFSET + (index - index_first_open) * self.OFFSET_OPEN)
 
     def clear(self):
         """Clear cards stack."""
         super().clear()
         for row in self.rows:
             row.clear()
+        self.first_open = [0] * len(self.rows)
 
     def if_empty(self):
         """Check stack cards of empty."""
@@ -291,22 +320,6 @@ class ZoneColumns(ZoneBase):
         """Return card in current row for index."""
         return self.rows[self.current_row][index]
 
-    def take(self, cards, old_list):
-        """Check take card for put row."""
-        if self.if_empty():
-            if 'king' == cards[0].rate:
-                for card in cards:
-                    self.rows[self.current_row].append(card)
-                    old_list.remove(card)
-                return True
-            return False
-        elif checker.change_suit(cards[0], self.get_card(-1)) and cards[0].rate_index + 1 == self.get_card(-1).rate_index:
-            for card in cards:
-                self.rows[self.current_row].append(card)
-                old_list.remove(card)
-            return True
-        return False
-
 
 def get_zones():
     """Return all zones classes."""